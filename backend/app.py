@@ -18,7 +18,15 @@ import hashlib
 import json
 
 from config import Config
-from database import init_db, get_db
+from models.motion_gate import MotionGate
+from models.face_roi import ROIFaceDetector
+from models.face_tracker import FaceTracker
+from models.recognition_cache import RecognitionCache, face_quality
+from models.histogram_matcher import HistogramMatcher
+from database import (
+    init_db, get_db, load_face_embeddings, get_face_embedding_hashes,
+    save_face_embeddings, delete_face_embeddings
+)
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -36,58 +44,63 @@ alarm_active = False  # Global alarm state
 
 # ============== MODELS ==============
 
-class FaceDetector:
+class FaceDetector(HistogramMatcher):
     def __init__(self):
+        super().__init__()
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         )
-        self.known_faces = {}  # name -> embeddings
+        self.face_roi = ROIFaceDetector(self.face_cascade, min_neighbors=4, min_size=(0, 0))
         
-    def detect_faces(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-        return faces
-    
-    def get_face_embedding(self, face_img):
-        # Simple embedding using histogram
-        face_resized = cv2.resize(face_img, (100, 100))
-        gray = cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY)
-        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        return hist.flatten()
-    
-    def recognize_face(self, face_img, user_id):
-        if user_id not in self.known_faces or not self.known_faces[user_id]:
-            return "Unknown", 0.0, True
+    def detect_faces(self, frame, person_boxes=None, roi_state=None):
+        # Full frame unless ROI mode is on and person boxes and this camera's ROI state are given
+        return self.face_roi.detect(frame, person_boxes, state=roi_state)
+    
+    def load_known_faces(self):
+        # Bulk-load every stored histogram once, replacing the in-memory gallery
+        known_faces = {}
+        for row in load_face_embeddings():
+            embedding = np.frombuffer(row['embedding'], dtype=np.float32)
+            known_faces.setdefault(row['user_id'], {}).setdefault(row['name'], []).append(embedding)
         
-        embedding = self.get_face_embedding(face_img)
-        best_match = "Unknown"
-        best_score = 0.0
+        self.set_known_faces(known_faces)
+        return sum(len(e) for faces in known_faces.values() for e in faces.values())
+    
+    def sync_person(self, user_id, name, person_dir):
+        # Embed only images not stored yet; images no longer in person_dir are dropped
+        stored_hashes = get_face_embedding_hashes(user_id, name)
+        
+        images = {}  # content hash -> file bytes, identical files count once
+        for img_file in sorted(os.listdir(person_dir)):
+            img_path = os.path.join(person_dir, img_file)
+            if not os.path.isfile(img_path):
+                continue
+            with open(img_path, 'rb') as f:
+                data = f.read()
+            images.setdefault(hashlib.sha1(data).hexdigest(), data)
         
-        for name, stored_embeddings in self.known_faces[user_id].items():
-            for stored_emb in stored_embeddings:
-                score = cv2.compareHist(
-                    embedding.astype(np.float32),
-                    stored_emb.astype(np.float32),
-                    cv2.HISTCMP_CORREL
-                )
-                if score > best_score:
-                    best_score = score
-                    best_match = name
+        new_embeddings = {}
+        for source_hash, data in images.items():
+            if source_hash in stored_hashes:
+                continue
+            img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if img is not None:
+                new_embeddings[source_hash] = self.get_face_embedding(img).astype(np.float32).tobytes()
         
-        is_intruder = best_score < Config.FACE_RECOGNITION_THRESHOLD
-        return best_match if not is_intruder else "Intruder", best_score, is_intruder
-
-    def add_known_face(self, user_id, name, face_img):
-        if user_id not in self.known_faces:
-            self.known_faces[user_id] = {}
-        if name not in self.known_faces[user_id]:
-            self.known_faces[user_id][name] = []
+        face_id, stored = save_face_embeddings(
+            user_id, name, person_dir, new_embeddings, set(images)
+        )
         
-        embedding = self.get_face_embedding(face_img)
-        self.known_faces[user_id][name].append(embedding)
+        self.set_person(user_id, name, [np.frombuffer(data, dtype=np.float32) for data in stored])
+        return face_id, len(new_embeddings)
+    
+    def remove_person(self, user_id, name):
+        delete_face_embeddings(user_id, name)
+        super().remove_person(user_id, name)
 
 # Initialize detector
 face_detector = FaceDetector()
+face_detector.load_known_faces()
 
 # ============== CAMERA SERVICE ==============
 
@@ -137,24 +150,56 @@ def detection_loop(camera_id, user_id):
     if not camera:
         return
     
+    motion_gate = MotionGate()
+    face_tracker = FaceTracker()
+    roi_state = ROIFaceDetector.new_state()  # face_detector is shared, its ROI counters are not
+    recognition_cache = RecognitionCache() if Config.RECOGNITION_CACHE_ENABLED else None
+    person_boxes = None
+    
     while camera.running:
         frame = camera.get_frame()
         if frame is None:
             time.sleep(0.1)
             continue
         
+        # Static scene: keep the last detections, only re-check on keep-alive frames
+        if Config.MOTION_GATE_ENABLED and not motion_gate.check(frame):
+            time.sleep(0.1)
+            continue
+        
         # Detect faces
-        faces = face_detector.detect_faces(frame)
+        # Haar every FACE_REDETECT_INTERVAL frames, optical flow follows the faces in between
+        tracks = face_tracker.update(
+            frame, lambda f: face_detector.detect_faces(f, person_boxes, roi_state)
+        )
+        faces = [track['bbox'] for track in tracks]
         detections = []
+        if recognition_cache is not None:
+            recognition_cache.prune([track['id'] for track in tracks] + list(face_tracker.missing))
         
-        for (x, y, w, h) in faces:
+        # No person detector here: search next frame around the faces just found, grown
+        # to a head-and-shoulders box; new faces are picked up by the full-frame passes
+        person_boxes = [(x - w, y - h, 3 * w, 6 * h) for (x, y, w, h) in faces]
+        
+        for track, (x, y, w, h) in zip(tracks, faces):
             face_img = frame[y:y+h, x:x+w]
-            name, confidence, is_intruder = face_detector.recognize_face(face_img, user_id)
+            if recognition_cache is None:
+                name, confidence, is_intruder = face_detector.recognize_face(face_img, user_id)
+            else:
+                # Same track, same gallery: reuse the last result until it needs a fresh look
+                gallery = face_detector.get_gallery(user_id)
+                quality = face_quality(face_img)
+                result = recognition_cache.get(track['id'], quality, gallery)
+                if result is None:
+                    result = face_detector.recognize_face(face_img, user_id)
+                    recognition_cache.put(track['id'], result, quality, gallery)
+                name, confidence, is_intruder = result
             
             detection = {
                 'name': name,
                 'confidence': float(confidence),
                 'isIntruder': is_intruder,
+                'trackId': track['id'],
                 'boundingBox': {
                     'x': int(x / frame.shape[1] * 100),
                     'y': int(y / frame.shape[0] * 100),
@@ -447,19 +492,9 @@ def add_known_face():
         # Save image
         filepath = os.path.join(person_dir, f'{name}_{i:03d}.jpg')
         cv2.imwrite(filepath, img)
-        
-        # Add to face detector
-        face_detector.add_known_face(user_id, name, img)
     
-    # Save to database
-    face_id = str(uuid.uuid4())
-    conn = get_db()
-    conn.execute('''
-        INSERT INTO known_faces (id, user_id, name, image_count)
-        VALUES (?, ?, ?, ?)
-    ''', (face_id, user_id, name, len(images)))
-    conn.commit()
-    conn.close()
+    # Embed the new images into face_embeddings and the face detector
+    face_id, _ = face_detector.sync_person(user_id, name, person_dir)
     
     return jsonify({'success': True, 'id': face_id})
 
@@ -523,19 +558,24 @@ def start_training():
     user_id = data.get('userId')
     
     # In production, this would trigger actual model training
-    # For now, just reload embeddings from disk
+    # For now, sync stored embeddings with the images on disk
     train_dir = Config.TRAIN_DIR
+    people = set()
+    new_embeddings = 0
     if os.path.exists(train_dir):
         for person_name in os.listdir(train_dir):
             person_dir = os.path.join(train_dir, person_name)
             if os.path.isdir(person_dir):
-                for img_file in os.listdir(person_dir):
-                    img_path = os.path.join(person_dir, img_file)
-                    img = cv2.imread(img_path)
-                    if img is not None:
-                        face_detector.add_known_face(user_id, person_name, img)
+                _, added = face_detector.sync_person(user_id, person_name, person_dir)
+                new_embeddings += added
+                people.add(person_name)
     
-    return jsonify({'success': True})
+    # People whose folder was deleted leave the gallery
+    for person_name in list(face_detector.known_faces.get(user_id, {})):
+        if person_name not in people:
+            face_detector.remove_person(user_id, person_name)
+    
+    return jsonify({'success': True, 'newEmbeddings': new_embeddings})
 
 @app.route('/api/stats/<camera_id>')
 def get_stats(camera_id):
@@ -0,0 +1,48 @@
+#bench_ann_index.py
+# Run from backend/: python -m benchmarks.bench_ann_index [gallery_size]
+import sys
+import time
+import numpy as np
+from models.face_gallery import FaceGallery
+from models.face_ann_index import IVFIndex
+
+def clustered_embeddings(rng, n, dim, people):
+    """Unit vectors grouped around one random centre per person"""
+    centres = rng.standard_normal((people, dim))
+    owners = rng.integers(0, people, n)
+    data = centres[owners] + 1.2 * rng.standard_normal((n, dim))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32), owners
+
+def search_one_by_one(gallery, queries, exact=False):
+    """Per-query latency, as seen by recognize() with one face in frame"""
+    indices = np.zeros(len(queries), dtype=np.intp)
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        indices[i] = gallery.search(query, k=1, exact=exact)[1][0, 0]
+    return indices, (time.perf_counter() - start) / len(queries)
+
+def main(size=20000, dim=985, num_queries=200, nprobes=(1, 4, 8, 16, 32)):
+    rng = np.random.default_rng(0)
+    people = max(1, size // 20)
+    data, _ = clustered_embeddings(rng, size + num_queries, dim, people)
+    known, queries = data[:size], data[size:]
+    
+    gallery = FaceGallery(index=IVFIndex(), ann_min_size=0)
+    gallery.add(known, [str(i) for i in range(size)])
+    
+    start = time.perf_counter()
+    gallery.build_index()
+    print(f"Built IVF index over {size} embeddings ({len(gallery.index.lists)} lists) "
+          f"in {time.perf_counter() - start:.1f} s")
+    
+    exact, exact_time = search_one_by_one(gallery, queries, exact=True)
+    print(f"exact          : {exact_time * 1e6:8.1f} us/query, recall@1 1.000")
+    
+    for nprobe in nprobes:
+        gallery.index.nprobe = nprobe
+        approx, approx_time = search_one_by_one(gallery, queries)
+        recall = np.mean(approx == exact)
+        print(f"ivf nprobe={nprobe:<4}: {approx_time * 1e6:8.1f} us/query, recall@1 {recall:.3f}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
\ No newline at end of file
@@ -0,0 +1,85 @@
+#bench_detector_backends.py
+# Run from backend/: python -m benchmarks.bench_detector_backends [image ...]
+# Compares FPS and box agreement of the ONNX backends against the ultralytics path.
+import sys
+import time
+import cv2
+import numpy as np
+from config import Config
+from models.object_detector import ObjectDetector
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+def agreement(reference, candidate, min_iou=0.5):
+    """Greedy same-class matching; returns (matched, reference boxes, candidate boxes, IoU sum)"""
+    used = set()
+    matched = 0
+    iou_sum = 0.0
+    for ref in sorted(reference, key=lambda d: -d['confidence']):
+        best, best_iou = None, min_iou
+        for j, cand in enumerate(candidate):
+            if j in used or cand['class_id'] != ref['class_id']:
+                continue
+            overlap = iou(ref['bbox'], cand['bbox'])
+            if overlap >= best_iou:
+                best, best_iou = j, overlap
+        if best is not None:
+            used.add(best)
+            matched += 1
+            iou_sum += best_iou
+    return matched, len(reference), len(candidate), iou_sum
+
+def load_frames(paths):
+    if not paths:
+        from ultralytics.utils import ASSETS
+        paths = [str(ASSETS / 'bus.jpg'), str(ASSETS / 'zidane.jpg')]
+    frames = [cv2.imread(p) for p in paths]
+    return [f for f in frames if f is not None]
+
+def run(detector, frames, repeat):
+    outputs = [detector.detect(frame) or [] for frame in frames]  # warm-up and outputs
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            detector.detect(frame)
+    fps = repeat * len(frames) / (time.perf_counter() - start)
+    return fps, outputs
+
+def main(paths=None, repeat=10):
+    frames = load_frames(paths)
+    size = Config.DETECTOR_INPUT_SIZE
+    candidates = [
+        ('ultralytics', False), ('onnxruntime', False), ('onnxruntime', True), ('opencv', False)
+    ]
+    
+    reference = None
+    for backend, int8 in candidates:
+        detector = ObjectDetector(backend=backend, input_size=size, int8=int8)
+        if detector.backend != backend or (detector.model is None and detector.onnx_model is None):
+            print(f"{backend:<12} unavailable, skipped")
+            continue
+        
+        fps, outputs = run(detector, frames, repeat)
+        name = f"{backend}{' int8' if int8 else ''}"
+        if reference is None:
+            reference = outputs
+            print(f"{name:<17} {fps:7.1f} FPS  (reference, {sum(map(len, outputs))} boxes)")
+            continue
+        
+        totals = np.sum([agreement(r, c) for r, c in zip(reference, outputs)], axis=0)
+        matched, n_ref, n_cand, iou_sum = totals
+        recall = matched / n_ref if n_ref else 1.0
+        precision = matched / n_cand if n_cand else 1.0
+        mean_iou = iou_sum / matched if matched else 0.0
+        print(f"{name:<17} {fps:7.1f} FPS  recall {recall:.3f}  precision {precision:.3f}  "
+              f"mean IoU {mean_iou:.3f}")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
\ No newline at end of file
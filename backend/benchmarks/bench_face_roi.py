@@ -0,0 +1,57 @@
+#bench_face_roi.py
+# Run from backend/: python -m benchmarks.bench_face_roi [image ...]
+# Times full-frame Haar face detection against the person-box ROI mode on 640x480 frames.
+import sys
+import glob
+import time
+import cv2
+import numpy as np
+from models.face_roi import ROIFaceDetector
+
+# (x, y, w, h) person boxes as YOLO would report them on a 640x480 frame
+LAYOUTS = {
+    'one person in a corner': [(500, 20, 120, 300)],
+    'two people': [(60, 40, 160, 420), (380, 60, 150, 400)],
+    'four people': [(20, 30, 110, 330), (180, 50, 110, 330), (340, 30, 110, 330), (500, 50, 110, 330)]
+}
+
+def load_frames(paths):
+    frames = [cv2.imread(p) for p in paths or sorted(glob.glob('data/*/*/*.jpg'))[:5]]
+    frames = [cv2.resize(f, (640, 480)) for f in frames if f is not None]
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (9, 9), 0)]
+    return frames
+
+def time_detect(detector, frames, boxes, repeat, state=None):
+    faces = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            faces += len(detector.detect(frame, boxes, state=state))
+    ms = (time.perf_counter() - start) * 1000 / (repeat * len(frames))
+    return ms, faces / repeat
+
+def main(paths=None, repeat=10):
+    frames = load_frames(paths)
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    
+    full = ROIFaceDetector(cascade, enabled=False)
+    for label, boxes in LAYOUTS.items():
+        roi = ROIFaceDetector(cascade, enabled=True, full_frame_interval=10 ** 9)
+        state = roi.new_state()
+        roi.detect(frames[0], boxes, state=state)  # the first call is always a full-frame search
+        
+        full_ms, full_faces = time_detect(full, frames, boxes, repeat)
+        roi_ms, roi_faces = time_detect(roi, frames, boxes, repeat, state)
+        area = sum((x2 - x1) * (y2 - y1) for (x1, y1, x2, y2) in state['last_rois']) / (640 * 480)
+        print(f"{label:<23} full {full_ms:6.2f} ms ({full_faces:.0f} faces)  "
+              f"roi {roi_ms:6.2f} ms ({roi_faces:.0f} faces, {area:4.0%} of frame)  "
+              f"{full_ms / roi_ms:4.1f}x")
+    
+    # With the default fallback interval every N-th frame is a full-frame search
+    interval = ROIFaceDetector(cascade, enabled=True).full_frame_interval
+    print(f"full-frame pass every {interval} frames")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
\ No newline at end of file
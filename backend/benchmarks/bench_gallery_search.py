@@ -0,0 +1,49 @@
+#bench_gallery_search.py
+# Run from backend/: python -m benchmarks.bench_gallery_search
+import time
+import numpy as np
+from models.face_gallery import FaceGallery
+
+def random_embeddings(rng, n, dim):
+    data = rng.random((n, dim))
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+def list_search(known_embeddings, embedding):
+    """Original per-row distance scan over nested lists"""
+    distances = [np.linalg.norm(embedding - known) for known in known_embeddings]
+    min_idx = np.argmin(distances)
+    return distances[min_idx], min_idx
+
+def time_queries(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries)
+
+def main(sizes=(100, 1000, 5000), dim=985, num_queries=50):
+    rng = np.random.default_rng(0)
+    queries = random_embeddings(rng, num_queries, dim)
+    
+    for size in sizes:
+        known = random_embeddings(rng, size, dim)
+        known_list = known.tolist()
+        gallery = FaceGallery()
+        gallery.add(known, [str(i) for i in range(size)])
+        
+        for query in queries[:10]:
+            _, expected = list_search(known_list, query)
+            _, indices = gallery.search(query, k=1)
+            if indices[0, 0] != expected:
+                raise AssertionError("Gallery search disagrees with list scan")
+        
+        before = time_queries(lambda q: list_search(known_list, q), queries)
+        after = time_queries(lambda q: gallery.search(q, k=1), queries)
+        start = time.perf_counter()
+        gallery.search(queries, k=1)
+        batched = (time.perf_counter() - start) / num_queries
+        
+        print(f"{size:>6} known: list scan {before * 1e6:9.1f} us, "
+              f"matmul {after * 1e6:8.1f} us, batched {batched * 1e6:8.1f} us/query")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
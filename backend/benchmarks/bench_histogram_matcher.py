@@ -0,0 +1,60 @@
+#bench_histogram_matcher.py
+# Run from backend/: python -m benchmarks.bench_histogram_matcher
+import time
+import cv2
+import numpy as np
+from models.histogram_matcher import HistogramMatcher
+
+def loop_match(known_faces, embedding):
+    """Original per-histogram compareHist loop"""
+    best_match = "Unknown"
+    best_score = 0.0
+    for name, stored_embeddings in known_faces.items():
+        for stored_emb in stored_embeddings:
+            score = cv2.compareHist(
+                embedding.astype(np.float32),
+                stored_emb.astype(np.float32),
+                cv2.HISTCMP_CORREL
+            )
+            if score > best_score:
+                best_score = score
+                best_match = name
+    return best_match, best_score
+
+def random_face(rng, base=None):
+    if base is None:
+        return rng.integers(0, 256, (120, 120, 3), dtype=np.uint8)
+    noise = rng.integers(-25, 25, base.shape)
+    return np.clip(base.astype(int) + noise, 0, 255).astype(np.uint8)
+
+def time_queries(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries)
+
+def main(sizes=(10, 100, 1000), people=10, num_queries=50):
+    rng = np.random.default_rng(0)
+    bases = [random_face(rng) for _ in range(people)]
+    queries = [random_face(rng, bases[i % people]) for i in range(num_queries)]
+    
+    for size in sizes:
+        matcher = HistogramMatcher(threshold=0.6)
+        for p in range(people):
+            faces = [random_face(rng, bases[p]) for _ in range(p, size, people)]
+            matcher.set_person('bench', f'person_{p}', [matcher.get_face_embedding(f) for f in faces])
+        known = matcher.known_faces['bench']
+        
+        for query in queries[:10]:
+            expected_name, expected_score = loop_match(known, matcher.get_face_embedding(query))
+            name, score, _ = matcher.recognize_face(query, 'bench')
+            if abs(score - expected_score) > 1e-4 or (name not in (expected_name, 'Intruder')):
+                raise AssertionError("Vectorized matcher disagrees with compareHist loop")
+        
+        before = time_queries(lambda q: loop_match(known, matcher.get_face_embedding(q)), queries)
+        after = time_queries(lambda q: matcher.recognize_face(q, 'bench'), queries)
+        print(f"{size:>5} stored faces: compareHist loop {before * 1e6:9.1f} us, "
+              f"vectorized {after * 1e6:8.1f} us/face ({before / after:.1f}x)")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+#bench_training_workers.py
+# Run from backend/: python -m benchmarks.bench_training_workers
+import os
+import time
+import tempfile
+import cv2
+import numpy as np
+from config import Config
+from models.face_recognition import FaceRecognizer
+
+def write_images(root, people=8, per_person=40, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for p in range(people):
+        person_dir = os.path.join(root, f'person_{p}')
+        os.makedirs(person_dir)
+        for i in range(per_person):
+            path = os.path.join(person_dir, f'person_{p}_{i:03d}.jpg')
+            cv2.imwrite(path, rng.integers(0, 256, (240, 200, 3), dtype=np.uint8))
+            paths.append(path)
+    return paths
+
+def main(worker_counts=None):
+    cores = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, cores})
+    recognizer = FaceRecognizer()
+    
+    with tempfile.TemporaryDirectory() as root:
+        paths = write_images(root)
+        baseline = None
+        for workers in worker_counts:
+            Config.FACE_TRAIN_WORKERS = workers
+            start = time.perf_counter()
+            for _ in recognizer._embed_files(paths):
+                pass
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>2} workers: {elapsed:6.2f} s for {len(paths)} images "
+                  f"({baseline / elapsed:.1f}x)")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
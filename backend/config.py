@@ -38,6 +38,90 @@ class Config:
     FACE_CONFIDENCE_THRESHOLD = float(os.getenv('FACE_CONFIDENCE_THRESHOLD', 0.6))
     INTRUDER_ALERT_COOLDOWN = int(os.getenv('INTRUDER_ALERT_COOLDOWN', 30))
     
+    # Face gallery ANN index (IVF), used once the gallery reaches FACE_ANN_MIN_SIZE
+    FACE_ANN_ENABLED = os.getenv('FACE_ANN_ENABLED', 'False').lower() == 'true'
+    FACE_ANN_MIN_SIZE = int(os.getenv('FACE_ANN_MIN_SIZE', 20000))
+    FACE_ANN_NLIST = int(os.getenv('FACE_ANN_NLIST', 0))  # 0 = 4 * sqrt(gallery size)
+    FACE_ANN_NPROBE = int(os.getenv('FACE_ANN_NPROBE', 8))
+    
+    # Seconds to wait after an enrollment before refitting SVM/RF in the background
+    FACE_RETRAIN_DELAY = float(os.getenv('FACE_RETRAIN_DELAY', 5))
+    
+    # Threads decoding and embedding images during training (1 = serial)
+    FACE_TRAIN_WORKERS = int(os.getenv('FACE_TRAIN_WORKERS', os.cpu_count() or 1))
+    
+    # Seconds between checks for a newer saved face model generation
+    FACE_MODEL_POLL_INTERVAL = float(os.getenv('FACE_MODEL_POLL_INTERVAL', 2))
+    
+    # Search faces only in the upper FACE_ROI_UPPER_FRACTION of person boxes,
+    # with a full-frame search every FACE_ROI_FULL_FRAME_INTERVAL-th frame
+    FACE_ROI_ENABLED = os.getenv('FACE_ROI_ENABLED', 'False').lower() == 'true'
+    FACE_ROI_UPPER_FRACTION = float(os.getenv('FACE_ROI_UPPER_FRACTION', 0.5))
+    FACE_ROI_FULL_FRAME_INTERVAL = int(os.getenv('FACE_ROI_FULL_FRAME_INTERVAL', 10))
+    
+    # Run Haar every FACE_REDETECT_INTERVAL frames and follow faces with optical flow
+    # in between; without tracking faces are detected on every frame
+    FACE_TRACKING_ENABLED = os.getenv('FACE_TRACKING_ENABLED', 'False').lower() == 'true'
+    FACE_REDETECT_INTERVAL = int(os.getenv('FACE_REDETECT_INTERVAL', 5))
+    # Seconds a face track (and its state) outlives its last sighting; at most FACE_TRACK_MAX
+    # tracks per camera, each keeping FACE_LIVENESS_HISTORY liveness results
+    FACE_TRACK_TIMEOUT = float(os.getenv('FACE_TRACK_TIMEOUT', 2))
+    FACE_TRACK_MAX = int(os.getenv('FACE_TRACK_MAX', 50))
+    FACE_LIVENESS_HISTORY = int(os.getenv('FACE_LIVENESS_HISTORY', 10))
+    
+    # Person tracks end after PERSON_TRACK_MAX_AGE seconds unmatched (IoU >= PERSON_TRACK_IOU);
+    # a track in view for LOITERING_SECONDS raises a loitering alert
+    PERSON_TRACK_MAX_AGE = float(os.getenv('PERSON_TRACK_MAX_AGE', 1))
+    PERSON_TRACK_IOU = float(os.getenv('PERSON_TRACK_IOU', 0.3))
+    LOITERING_SECONDS = float(os.getenv('LOITERING_SECONDS', 60))
+    
+    # Reuse a face track's recognition result until its confidence is low, the face
+    # quality improves by RECOGNITION_CACHE_QUALITY_GAIN or RECOGNITION_CACHE_TTL seconds pass
+    RECOGNITION_CACHE_ENABLED = os.getenv('RECOGNITION_CACHE_ENABLED', 'False').lower() == 'true'
+    RECOGNITION_CACHE_TTL = float(os.getenv('RECOGNITION_CACHE_TTL', 2))
+    RECOGNITION_CACHE_QUALITY_GAIN = float(os.getenv('RECOGNITION_CACHE_QUALITY_GAIN', 0.2))
+    
+    # Object detector (YOLO) inference backend: ultralytics, onnxruntime or opencv
+    # ONNX backends read <DETECTOR_MODEL>-<DETECTOR_INPUT_SIZE>[-dynamic].onnx (or .int8.onnx) from
+    # PRETRAINED_MODELS_DIR, exporting it there first if missing; -dynamic is the onnxruntime export
+    DETECTOR_BACKEND = os.getenv('DETECTOR_BACKEND', 'ultralytics').lower()
+    DETECTOR_MODEL = os.getenv('DETECTOR_MODEL', 'yolov8n')
+    DETECTOR_INPUT_SIZE = int(os.getenv('DETECTOR_INPUT_SIZE', 640))
+    DETECTOR_INT8 = os.getenv('DETECTOR_INT8', 'False').lower() == 'true'
+    DETECTOR_THREADS = int(os.getenv('DETECTOR_THREADS', 0))  # 0 = runtime default
+    DETECTOR_CONFIDENCE = float(os.getenv('DETECTOR_CONFIDENCE', 0.25))
+    DETECTOR_IOU = float(os.getenv('DETECTOR_IOU', 0.7))
+    
+    # Motion gate: heavy models only run on frames whose downscaled MOG2 foreground
+    # exceeds MOTION_GATE_THRESHOLD (fraction of pixels), for MOTION_GATE_HOLD frames
+    # after that, and on every MOTION_GATE_KEEPALIVE-th idle frame. Off by default: gated
+    # frames skip every stage, including anomaly checks on people standing still
+    MOTION_GATE_ENABLED = os.getenv('MOTION_GATE_ENABLED', 'False').lower() == 'true'
+    MOTION_GATE_WIDTH = int(os.getenv('MOTION_GATE_WIDTH', 160))
+    MOTION_GATE_THRESHOLD = float(os.getenv('MOTION_GATE_THRESHOLD', 0.005))
+    MOTION_GATE_HOLD = int(os.getenv('MOTION_GATE_HOLD', 10))
+    MOTION_GATE_KEEPALIVE = int(os.getenv('MOTION_GATE_KEEPALIVE', 30))
+    
+    # Ensemble stage scheduling as "stage:value" lists (stages: objects, faces, anomaly, pose)
+    # Cadence is runs per second (0 = every frame); budget is the share of wall-clock time a
+    # stage may use, slower stages are spaced out further (0 = unlimited)
+    ENSEMBLE_STAGE_CADENCE = os.getenv('ENSEMBLE_STAGE_CADENCE', 'objects:10,faces:10,anomaly:2,pose:3')
+    ENSEMBLE_STAGE_BUDGET = os.getenv('ENSEMBLE_STAGE_BUDGET', 'objects:0.5,faces:0.5,anomaly:0.1,pose:0.2')
+    
+    # Run independent ensemble stages concurrently on a thread pool
+    ENSEMBLE_PARALLEL = os.getenv('ENSEMBLE_PARALLEL', 'False').lower() == 'true'
+    ENSEMBLE_WORKERS = int(os.getenv('ENSEMBLE_WORKERS', 4))
+    
+    # Per-camera detector state (background model, pose tracking, trackers) kept resident
+    # for at most CAMERA_STATE_MAX cameras; cameras idle for CAMERA_STATE_IDLE_TIMEOUT seconds are dropped
+    CAMERA_STATE_MAX = int(os.getenv('CAMERA_STATE_MAX', 16))
+    CAMERA_STATE_IDLE_TIMEOUT = float(os.getenv('CAMERA_STATE_IDLE_TIMEOUT', 300))
+    
+    # Batch YOLO calls across cameras; a batch waits at most INFERENCE_BATCH_MAX_WAIT seconds
+    INFERENCE_BATCH_ENABLED = os.getenv('INFERENCE_BATCH_ENABLED', 'False').lower() == 'true'
+    INFERENCE_BATCH_MAX_WAIT = float(os.getenv('INFERENCE_BATCH_MAX_WAIT', 0.03))
+    INFERENCE_BATCH_SIZE = int(os.getenv('INFERENCE_BATCH_SIZE', 8))
+    
     # Night Mode
     NIGHT_MODE_START = int(os.getenv('NIGHT_MODE_START', 22))
     NIGHT_MODE_END = int(os.getenv('NIGHT_MODE_END', 6))
@@ -95,11 +95,23 @@ def init_db():
             id TEXT PRIMARY KEY,
             known_face_id TEXT NOT NULL,
             embedding BLOB NOT NULL,
+            source_hash TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (known_face_id) REFERENCES known_faces(id)
         )
     ''')
     
+    # Databases created before source_hash existed get the column added in place
+    columns = [row['name'] for row in cursor.execute('PRAGMA table_info(face_embeddings)')]
+    if 'source_hash' not in columns:
+        cursor.execute('ALTER TABLE face_embeddings ADD COLUMN source_hash TEXT')
+    
+    # One embedding per source image of a person
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_face_embeddings_source
+        ON face_embeddings (known_face_id, source_hash)
+    ''')
+    
     # Activity logs table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS activity_logs (
@@ -192,5 +204,95 @@ def authenticate_user(username, password):
     conn.close()
     return None
 
+def _get_known_face_id(cursor, user_id, name, folder_path):
+    """Get id of the known face for user and name, creating it if needed"""
+    cursor.execute('''
+        SELECT id FROM known_faces WHERE user_id = ? AND name = ?
+    ''', (user_id, name))
+    row = cursor.fetchone()
+    if row:
+        return row['id']
+    
+    face_id = str(uuid.uuid4())
+    cursor.execute('''
+        INSERT INTO known_faces (id, user_id, name, folder_path)
+        VALUES (?, ?, ?, ?)
+    ''', (face_id, user_id, name, folder_path))
+    return face_id
+
+def load_face_embeddings():
+    """Load every stored face embedding with its user and person name"""
+    conn = get_db()
+    rows = conn.execute('''
+        SELECT k.user_id, k.name, e.embedding
+        FROM face_embeddings e JOIN known_faces k ON e.known_face_id = k.id
+        ORDER BY k.user_id, k.name, e.created_at
+    ''').fetchall()
+    conn.close()
+    return rows
+
+def get_face_embedding_hashes(user_id, name):
+    """Source image hashes already embedded for a person"""
+    conn = get_db()
+    rows = conn.execute('''
+        SELECT e.source_hash
+        FROM face_embeddings e JOIN known_faces k ON e.known_face_id = k.id
+        WHERE k.user_id = ? AND k.name = ?
+    ''', (user_id, name)).fetchall()
+    conn.close()
+    return {row['source_hash'] for row in rows}
+
+def save_face_embeddings(user_id, name, folder_path, embeddings, keep_hashes):
+    """Store new embeddings (source hash -> float32 bytes) and drop rows whose image is gone
+    
+    Returns the known face id and all embeddings now stored for the person.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    try:
+        face_id = _get_known_face_id(cursor, user_id, name, folder_path)
+        
+        cursor.executemany('''
+            INSERT OR REPLACE INTO face_embeddings (id, known_face_id, embedding, source_hash)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (str(uuid.uuid4()), face_id, sqlite3.Binary(data), source_hash)
+            for source_hash, data in embeddings.items()
+        ])
+        
+        cursor.execute('''
+            SELECT id, source_hash, embedding FROM face_embeddings
+            WHERE known_face_id = ? ORDER BY created_at
+        ''', (face_id,))
+        rows = cursor.fetchall()
+        
+        stale = [(row['id'],) for row in rows if row['source_hash'] not in keep_hashes]
+        cursor.executemany('DELETE FROM face_embeddings WHERE id = ?', stale)
+        stored = [row['embedding'] for row in rows if row['source_hash'] in keep_hashes]
+        
+        cursor.execute('''
+            UPDATE known_faces SET image_count = ? WHERE id = ?
+        ''', (len(stored), face_id))
+        
+        conn.commit()
+        return face_id, stored
+    finally:
+        conn.close()
+
+def delete_face_embeddings(user_id, name):
+    """Remove all stored embeddings of a person"""
+    conn = get_db()
+    conn.execute('''
+        DELETE FROM face_embeddings WHERE known_face_id IN (
+            SELECT id FROM known_faces WHERE user_id = ? AND name = ?
+        )
+    ''', (user_id, name))
+    conn.execute('''
+        UPDATE known_faces SET image_count = 0 WHERE user_id = ? AND name = ?
+    ''', (user_id, name))
+    conn.commit()
+    conn.close()
+
 if __name__ == '__main__':
     init_db()
\ No newline at end of file
@@ -1,7 +1,16 @@
 from .face_recognition import FaceRecognizer
+from .face_gallery import FaceGallery
+from .face_ann_index import IVFIndex
+from .histogram_matcher import HistogramMatcher
+from .model_bundle import ModelBundle
+from .object_detector import ObjectDetector
+from .inference_broker import InferenceBroker
 from .person_detector import PersonDetector
+from .person_tracker import PersonTracker
 from .weapon_detector import WeaponDetector
 from .mask_detector import MaskDetector
+from .frame_context import FrameContext
+from .motion_gate import MotionGate
 from .anomaly_detector import AnomalyDetector
 from .pose_estimator import PoseEstimator
 from .liveness_detector import LivenessDetector
@@ -9,9 +18,18 @@ from .ensemble import EnsembleClassifier
 
 __all__ = [
     'FaceRecognizer',
+    'FaceGallery',
+    'IVFIndex',
+    'HistogramMatcher',
+    'ModelBundle',
+    'ObjectDetector',
+    'InferenceBroker',
     'PersonDetector', 
+    'PersonTracker',
     'WeaponDetector',
     'MaskDetector',
+    'FrameContext',
+    'MotionGate',
     'AnomalyDetector',
     'PoseEstimator',
     'LivenessDetector',
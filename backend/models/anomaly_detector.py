@@ -2,34 +2,51 @@ import cv2
 import numpy as np
 import os
 from config import Config
+from .motion_gate import MotionGate
+from .frame_context import FrameContext
 
 class AnomalyDetector:
+    # The autoencoder is read-only, one copy serves every camera's detector
+    _shared_model = None
+    _model_attempted = False
+    
     def __init__(self):
         self.model = None
         self.background_model = None
         self.prev_frame = None
-        self.frame_history = []
+        # Scene history as a ring of 8x8x8 color histograms, not frames
         self.max_history = 30
+        self.hist_history = np.zeros((self.max_history, 512), dtype=np.float32)
+        self.hist_count = 0  # histograms stored so far, at most max_history
+        self.hist_next = 0  # ring slot the next histogram goes to
         self._load_model()
     
     def _load_model(self):
         """Load anomaly detection autoencoder"""
-        try:
-            import tensorflow as tf
-            model_path = os.path.join(Config.TRAINED_MODELS_DIR, 'anomaly_autoencoder.h5')
-            if os.path.exists(model_path):
-                self.model = tf.keras.models.load_model(model_path)
-                print("Anomaly autoencoder loaded")
-        except Exception as e:
-            print(f"Anomaly model not loaded: {e}")
+        if not AnomalyDetector._model_attempted:
+            AnomalyDetector._model_attempted = True
+            try:
+                import tensorflow as tf
+                model_path = os.path.join(Config.TRAINED_MODELS_DIR, 'anomaly_autoencoder.h5')
+                if os.path.exists(model_path):
+                    AnomalyDetector._shared_model = tf.keras.models.load_model(model_path)
+                    print("Anomaly autoencoder loaded")
+            except Exception as e:
+                print(f"Anomaly model not loaded: {e}")
+        self.model = AnomalyDetector._shared_model
         
         # Initialize background subtractor
         self.background_model = cv2.createBackgroundSubtractorMOG2(
             history=500, varThreshold=50, detectShadows=True
         )
+        
+        # Runs the subtractor on a downscaled frame; also gates the heavy models in the ensemble
+        self.motion_gate = MotionGate(self.background_model)
     
     def detect_anomalies(self, frame):
-        """Detect various anomalies in frame"""
+        """Detect various anomalies in frame (a BGR frame or FrameContext)"""
+        context = FrameContext.of(frame)
+        frame = context.frame
         anomalies = []
         
         # Check for static/frozen frame
@@ -41,7 +58,7 @@ class AnomalyDetector:
             })
         
         # Check for camera obstruction
-        obstruction = self._detect_obstruction(frame)
+        obstruction = self._detect_obstruction(context)
         if obstruction['is_obstructed']:
             anomalies.append({
                 'type': 'obstruction',
@@ -50,7 +67,7 @@ class AnomalyDetector:
             })
         
         # Check for unusual motion
-        motion = self._detect_unusual_motion(frame)
+        motion = self._detect_unusual_motion(context)
         if motion['is_unusual']:
             anomalies.append({
                 'type': 'unusual_motion',
@@ -68,7 +85,7 @@ class AnomalyDetector:
             })
         
         # Check for smoke/fog
-        smoke = self._detect_smoke_fog(frame)
+        smoke = self._detect_smoke_fog(context)
         if smoke['detected']:
             anomalies.append({
                 'type': smoke['type'],
@@ -80,22 +97,24 @@ class AnomalyDetector:
     
     def _is_frame_frozen(self, frame):
         """Detect if frame is frozen/static"""
-        if self.prev_frame is None:
+        if self.prev_frame is None or self.prev_frame.shape != frame.shape:
             self.prev_frame = frame.copy()
             return False
         
-        diff = cv2.absdiff(frame, self.prev_frame)
-        diff_sum = np.sum(diff)
+        # Sum of absolute differences in one pass, without a temporary diff image
+        diff_sum = cv2.norm(frame, self.prev_frame, cv2.NORM_L1)
         
-        self.prev_frame = frame.copy()
+        np.copyto(self.prev_frame, frame)
         
         # If almost no difference, frame might be frozen
         return diff_sum < 1000
     
     def _detect_obstruction(self, frame):
         """Detect camera obstruction (solid color, object blocking)"""
+        context = FrameContext.of(frame)
+        
         # Check for single color (covered camera)
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv = context.hsv
         
         # Check color variance
         h_var = np.var(hsv[:, :, 0])
@@ -109,7 +128,7 @@ class AnomalyDetector:
             }
         
         # Check for very dark image
-        brightness = np.mean(frame)
+        brightness = np.mean(context.frame)
         if brightness < 10:
             return {
                 'is_obstructed': True,
@@ -117,7 +136,7 @@ class AnomalyDetector:
             }
         
         # Check for blur (lens fog)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = context.gray
         laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
         if laplacian_var < 50:
             return {
@@ -132,12 +151,8 @@ class AnomalyDetector:
         if self.background_model is None:
             return {'is_unusual': False, 'description': ''}
         
-        fg_mask = self.background_model.apply(frame)
-        
-        # Count moving pixels
-        motion_pixels = np.sum(fg_mask > 127)
-        total_pixels = fg_mask.size
-        motion_ratio = motion_pixels / total_pixels
+        # Reuses the gate's measurement when it already saw this frame
+        motion_ratio = self.motion_gate.measure(frame)
         
         if motion_ratio > 0.5:  # More than 50% of frame moving
             return {
@@ -149,20 +164,20 @@ class AnomalyDetector:
     
     def _detect_scene_change(self, frame):
         """Detect significant scene changes (camera tampered)"""
-        self.frame_history.append(frame.copy())
-        if len(self.frame_history) > self.max_history:
-            self.frame_history.pop(0)
-        
-        if len(self.frame_history) < 2:
-            return {'changed': False}
-        
-        # Compare with historical average
+        # Each frame is histogrammed once, when it enters the ring
         current_hist = cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
         current_hist = cv2.normalize(current_hist, current_hist).flatten()
         
-        old_frame = self.frame_history[0]
-        old_hist = cv2.calcHist([old_frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-        old_hist = cv2.normalize(old_hist, old_hist).flatten()
+        self.hist_history[self.hist_next] = current_hist
+        self.hist_next = (self.hist_next + 1) % self.max_history
+        self.hist_count = min(self.hist_count + 1, self.max_history)
+        
+        if self.hist_count < 2:
+            return {'changed': False}
+        
+        # Compare with the oldest histogram still in the ring
+        oldest = self.hist_next if self.hist_count == self.max_history else 0
+        old_hist = self.hist_history[oldest]
         
         correlation = cv2.compareHist(current_hist, old_hist, cv2.HISTCMP_CORREL)
         
@@ -170,7 +185,7 @@ class AnomalyDetector:
     
     def _detect_smoke_fog(self, frame):
         """Detect smoke or fog in frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.of(frame).gray
         
         # Check for haziness
         contrast = gray.std()
@@ -188,7 +203,7 @@ class AnomalyDetector:
     
     def detect_shadow(self, frame):
         """Detect unusual shadows"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.of(frame).gray
         
         # Apply adaptive threshold to detect shadows
         thresh = cv2.adaptiveThreshold(
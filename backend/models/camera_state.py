@@ -0,0 +1,123 @@
+#camera_state.py
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+class CameraStates:
+    """Per-camera stateful components, created on first use and evicted least recently used first"""
+    
+    # factory(camera_id) builds one camera's state; on_evict(state) releases it. At most
+    # max_cameras states stay resident, and cameras idle for idle_timeout seconds go too.
+    # Every acquire() is paired with a release(); an evicted state still in use is only
+    # released once its last user is done with it.
+    def __init__(self, factory, max_cameras=None, idle_timeout=None, on_evict=None):
+        self.factory = factory
+        self.on_evict = on_evict
+        self.max_cameras = max_cameras or Config.CAMERA_STATE_MAX
+        self.idle_timeout = Config.CAMERA_STATE_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.states = OrderedDict()  # camera_id -> (state, last used), least recently used first
+        self.users = {}  # id(state) -> number of acquire() calls not yet released
+        self.retired = {}  # id(state) -> evicted state waiting for its users
+        self.lock = threading.Lock()
+        self.stats = {'created': 0, 'evicted': 0}
+    
+    def acquire(self, camera_id, now=None):
+        """State of camera_id, created if it is not resident; call release(state) when done"""
+        now = time.time() if now is None else now
+        with self.lock:
+            state = self._touch(camera_id, now)
+        
+        duplicate = None
+        if state is None:
+            # Building the models is slow, other cameras must not wait for it
+            built = self.factory(camera_id)
+            with self.lock:
+                state = self._touch(camera_id, now)
+                if state is None:
+                    state = built
+                    self.states[camera_id] = (state, now)
+                    self.users[id(state)] = 1
+                    self.stats['created'] += 1
+                else:
+                    duplicate = built  # another thread created this camera first
+        
+        with self.lock:
+            evicted = self._evict(now)
+        
+        # Release outside the lock, closing a model can be slow
+        if duplicate is not None:
+            self._close(duplicate)
+        for old in evicted:
+            self._close(old)
+        return state
+    
+    def release(self, state):
+        """Done with a state from acquire(); closes it if it was evicted meanwhile"""
+        with self.lock:
+            key = id(state)
+            self.users[key] -= 1
+            if self.users[key] > 0:
+                return
+            del self.users[key]
+            retired = self.retired.pop(key, None)
+        if retired is not None:
+            self._close(retired)
+    
+    def evict_idle(self, now=None):
+        """Drop cameras idle for longer than idle_timeout"""
+        now = time.time() if now is None else now
+        with self.lock:
+            evicted = self._evict(now)
+        for old in evicted:
+            self._close(old)
+    
+    def remove(self, camera_id):
+        with self.lock:
+            entry = self.states.pop(camera_id, None)
+            evicted = self._retire(entry[0]) if entry else []
+        for old in evicted:
+            self._close(old)
+    
+    def _touch(self, camera_id, now):
+        """Resident state of camera_id marked as used now, None if not resident"""
+        entry = self.states.pop(camera_id, None)
+        if entry is None:
+            return None
+        state = entry[0]
+        self.states[camera_id] = (state, now)
+        self.users[id(state)] = self.users.get(id(state), 0) + 1
+        return state
+    
+    def _evict(self, now):
+        evicted = []
+        while self.states:
+            camera_id, (state, last_used) = next(iter(self.states.items()))
+            idle = self.idle_timeout and now - last_used > self.idle_timeout
+            if not idle and len(self.states) <= self.max_cameras:
+                break
+            del self.states[camera_id]
+            evicted.extend(self._retire(state))
+            self.stats['evicted'] += 1
+        return evicted
+    
+    def _retire(self, state):
+        """States to close now; one still in use waits in retired for its last release()"""
+        if self.users.get(id(state)):
+            self.retired[id(state)] = state
+            return []
+        return [state]
+    
+    def _close(self, state):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(state)
+        except Exception as e:
+            print(f"Error releasing camera state: {e}")
+    
+    def __contains__(self, camera_id):
+        return camera_id in self.states
+    
+    def __len__(self):
+        return len(self.states)
\ No newline at end of file
@@ -0,0 +1,175 @@
+#detector_backends.py
+import os
+import cv2
+import numpy as np
+
+# COCO class names in YOLO order, cv2.dnn cannot read them from the ONNX metadata
+COCO_CLASSES = [
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat',
+    'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat',
+    'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 'backpack',
+    'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball',
+    'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket',
+    'bottle', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
+    'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair',
+    'couch', 'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse',
+    'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
+    'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier',
+    'toothbrush'
+]
+
+def onnx_model_path(models_dir, model_name, input_size=640, int8=False, dynamic=False):
+    """Path of the exported (optionally int8 quantized) ONNX model"""
+    # The export bakes in the input size and batch axis, so they are part of the name:
+    # a cached file exported for another setting is never picked up
+    name = f"{model_name}-{input_size}{'-dynamic' if dynamic else ''}"
+    suffix = '.int8.onnx' if int8 else '.onnx'
+    return os.path.join(models_dir, name + suffix)
+
+def export_onnx(models_dir, model_name, input_size=640, int8=False, dynamic=False):
+    """Export <model_name>.pt to ONNX with ultralytics, then quantize weights to int8 if asked"""
+    fp32_path = onnx_model_path(models_dir, model_name, input_size, dynamic=dynamic)
+    if not os.path.exists(fp32_path):
+        from ultralytics import YOLO
+        pt_path = os.path.join(models_dir, model_name + '.pt')
+        model = YOLO(pt_path if os.path.exists(pt_path) else model_name + '.pt')
+        exported = model.export(format='onnx', imgsz=input_size, dynamic=dynamic, simplify=True)
+        os.makedirs(models_dir, exist_ok=True)
+        os.replace(exported, fp32_path)
+    
+    if not int8:
+        return fp32_path
+    
+    int8_path = onnx_model_path(models_dir, model_name, input_size, int8=True, dynamic=dynamic)
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+def letterbox(frame, size):
+    """Resize keeping aspect ratio and pad to size x size, as YOLO was trained"""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_h, new_w = int(round(h * scale)), int(round(w * scale))
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    
+    # NCHW float32 RGB in [0, 1]
+    blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+    return blob, scale, left, top
+
+def decode_yolo(output, scale, left, top, frame_shape, conf_threshold, iou_threshold):
+    """Turn raw YOLOv8 output (1, 4 + classes, anchors) into boxes in frame coordinates"""
+    preds = np.squeeze(output, 0).T
+    scores = preds[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    
+    keep = confidences > conf_threshold
+    if not keep.any():
+        return []
+    preds, class_ids, confidences = preds[keep], class_ids[keep], confidences[keep]
+    
+    # Center/size in letterbox pixels -> corner/size in frame pixels
+    h, w = frame_shape[:2]
+    x1 = np.clip((preds[:, 0] - preds[:, 2] / 2 - left) / scale, 0, w)
+    y1 = np.clip((preds[:, 1] - preds[:, 3] / 2 - top) / scale, 0, h)
+    x2 = np.clip((preds[:, 0] + preds[:, 2] / 2 - left) / scale, 0, w)
+    y2 = np.clip((preds[:, 1] + preds[:, 3] / 2 - top) / scale, 0, h)
+    
+    # Class-aware NMS: shift each class into its own region so boxes of different classes never overlap
+    offset = class_ids[:, None] * (max(h, w) + 1)
+    shifted = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+    shifted[:, :2] += offset
+    indices = cv2.dnn.NMSBoxes(
+        shifted.tolist(), confidences.tolist(), conf_threshold, iou_threshold
+    )
+    
+    detections = []
+    for i in np.array(indices).reshape(-1):
+        cls = int(class_ids[i])
+        bx1, by1, bx2, by2 = int(x1[i]), int(y1[i]), int(x2[i]), int(y2[i])
+        detections.append({
+            'class_id': cls,
+            'class': COCO_CLASSES[cls] if cls < len(COCO_CLASSES) else str(cls),
+            'confidence': float(confidences[i]),
+            'bbox': (bx1, by1, bx2 - bx1, by2 - by1)
+        })
+    return detections
+
+class OnnxRuntimeBackend:
+    """YOLO ONNX model on the onnxruntime CPU provider"""
+    
+    name = 'onnxruntime'
+    
+    def __init__(self, model_path, threads=0):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=['CPUExecutionProvider']
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Symbolic batch dimension when exported with dynamic=True
+        self.batching = not isinstance(model_input.shape[0], int)
+    
+    def infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+class OpenCVDNNBackend:
+    """YOLO ONNX model on OpenCV's built-in DNN module, no extra runtime needed"""
+    
+    name = 'opencv'
+    batching = False
+    
+    def __init__(self, model_path, threads=0):
+        self.net = cv2.dnn.readNetFromONNX(model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        if threads:
+            cv2.setNumThreads(threads)
+    
+    def infer(self, blob):
+        self.net.setInput(blob)
+        return self.net.forward()
+
+BACKENDS = {
+    'onnxruntime': OnnxRuntimeBackend,
+    'opencv': OpenCVDNNBackend
+}
+
+class OnnxYOLO:
+    """Letterbox, run an ONNX backend and decode YOLO boxes into ObjectDetector detections"""
+    
+    def __init__(self, backend, input_size=640, conf_threshold=0.25, iou_threshold=0.7):
+        self.backend = backend
+        self.input_size = input_size
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+    
+    def detect(self, frame):
+        return self.detect_batch([frame])[0]
+    
+    def detect_batch(self, frames):
+        """Detections per frame; one inference call when the model has a dynamic batch axis"""
+        letterboxed = [letterbox(frame, self.input_size) for frame in frames]
+        if self.backend.batching and len(frames) > 1:
+            outputs = self.backend.infer(np.concatenate([lb[0] for lb in letterboxed]))
+            outputs = [outputs[i:i + 1] for i in range(len(frames))]
+        else:
+            outputs = [self.backend.infer(lb[0]) for lb in letterboxed]
+        
+        return [
+            decode_yolo(
+                output, scale, left, top, frame.shape, self.conf_threshold, self.iou_threshold
+            )
+            for frame, output, (_, scale, left, top) in zip(frames, outputs, letterboxed)
+        ]
\ No newline at end of file
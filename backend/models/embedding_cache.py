@@ -0,0 +1,200 @@
+#embedding_cache.py
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+class EmbeddingCache:
+    """Persistent face embeddings keyed by image content hash and feature-extractor version"""
+    
+    # Layout in cache_dir:
+    #   <name>.f32   raw float32 rows, appended in place and read through np.memmap
+    #   <name>.json  version, dim, row count, content hash -> row, file path -> hash
+    def __init__(self, cache_dir, version, name='embedding_cache'):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.data_path = os.path.join(cache_dir, f'{name}.f32')
+        self.index_path = os.path.join(cache_dir, f'{name}.json')
+        
+        self.dim = None
+        self.rows = 0
+        self.entries = {}  # content hash -> row
+        self.files = {}  # file path -> {'hash', 'size', 'mtime'}
+        self._matrix = None
+        self._pending = []  # embeddings appended since the last flush
+        self._loaded = False
+        self._dirty = False
+        # Enrollment (request thread) and background retrains use the cache concurrently
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        if not os.path.exists(self.index_path) or not os.path.exists(self.data_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except Exception as e:
+            print(f"Embedding cache unreadable, starting fresh: {e}")
+            return
+        
+        # Embeddings from another extractor version are useless, start over
+        if index.get('version') != self.version:
+            return
+        
+        try:
+            self.dim = index['dim']
+            self.rows = index['rows']
+            self.entries = index['entries']
+            self.files = index['files']
+            self._open_matrix()
+        except Exception as e:
+            print(f"Embedding cache unreadable, starting fresh: {e}")
+            self.dim, self.rows, self.entries, self.files = None, 0, {}, {}
+            self._matrix = None
+    
+    def _open_matrix(self):
+        self._matrix = None
+        if self.rows > 0:
+            # The data file may hold trailing rows from an interrupted flush, map only indexed ones
+            self._matrix = np.memmap(
+                self.data_path, dtype=np.float32, mode='r', shape=(self.rows, self.dim)
+            )
+    
+    @staticmethod
+    def content_hash(data):
+        return hashlib.sha1(data).hexdigest()
+    
+    def _file_hash(self, path):
+        """Content hash of path, reusing the recorded hash while size and mtime are unchanged"""
+        stat = os.stat(path)
+        record = self.files.get(path)
+        if record and record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns:
+            return record['hash']
+        
+        with open(path, 'rb') as f:
+            digest = self.content_hash(f.read())
+        self.files[path] = {'hash': digest, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        self._dirty = True
+        return digest
+    
+    def _row(self, row):
+        if row < self.rows:
+            return np.array(self._matrix[row])
+        return self._pending[row - self.rows]
+    
+    def get(self, path):
+        """Cached embedding for the image at path, or None if it has to be computed"""
+        with self._lock:
+            self._load()
+            try:
+                digest = self._file_hash(path)
+            except OSError:
+                return None
+            
+            row = self.entries.get(digest)
+            return None if row is None else self._row(row)
+    
+    def put(self, path, embedding, data=None):
+        """Store the embedding of the image at path (data: its bytes, if already in memory)"""
+        with self._lock:
+            self._load()
+            embedding = np.asarray(embedding, dtype=np.float32).ravel()
+            if self.dim is None:
+                self.dim = len(embedding)
+            
+            if data is None:
+                digest = self._file_hash(path)
+            else:
+                stat = os.stat(path)
+                digest = self.content_hash(data)
+                self.files[path] = {'hash': digest, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+            
+            if digest not in self.entries:
+                self.entries[digest] = self.rows + len(self._pending)
+                self._pending.append(embedding)
+            self._dirty = True
+    
+    def drop(self, prefix):
+        """Forget every file under prefix (e.g. a deleted person's folder)"""
+        with self._lock:
+            self._load()
+            prefix = os.path.join(os.path.normpath(prefix), '')
+            dropped = [p for p in self.files if os.path.normpath(p).startswith(prefix)]
+            for path in dropped:
+                del self.files[path]
+            if dropped:
+                self._dirty = True
+            return len(dropped)
+    
+    def retain(self, prefix, paths):
+        """Forget files under prefix that are not in paths (deleted since the last training)"""
+        with self._lock:
+            self._load()
+            prefix = os.path.join(os.path.normpath(prefix), '')
+            keep = set(paths)
+            stale = [
+                p for p in self.files
+                if os.path.normpath(p).startswith(prefix) and p not in keep
+            ]
+            for path in stale:
+                del self.files[path]
+            if stale:
+                self._dirty = True
+    
+    def flush(self):
+        """Append pending rows and rewrite the index; compacts once most rows are dead"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            live_hashes = {record['hash'] for record in self.files.values()}
+            total = self.rows + len(self._pending)
+            if total > 0 and len(live_hashes) * 2 < total:
+                self._compact(live_hashes)
+            elif self._pending:
+                # Truncate leftovers of an interrupted flush, then append
+                self._matrix = None
+                with open(self.data_path, 'ab') as f:
+                    f.truncate(self.rows * self.dim * 4)
+                    f.write(np.asarray(self._pending, dtype=np.float32).tobytes())
+                self.rows += len(self._pending)
+                self._pending = []
+            
+            self._write_index()
+            self._open_matrix()
+            self._dirty = False
+    
+    def _compact(self, live_hashes):
+        """Rewrite the data file keeping only rows still referenced by a file"""
+        kept = sorted((row, digest) for digest, row in self.entries.items() if digest in live_hashes)
+        matrix = np.zeros((len(kept), self.dim or 0), dtype=np.float32)
+        for i, (row, _) in enumerate(kept):
+            matrix[i] = self._row(row)
+        
+        self._matrix = None
+        tmp_path = self.data_path + '.tmp'
+        matrix.tofile(tmp_path)
+        os.replace(tmp_path, self.data_path)
+        
+        self.entries = {digest: i for i, (_, digest) in enumerate(kept)}
+        self.rows = len(kept)
+        self._pending = []
+    
+    def _write_index(self):
+        index = {
+            'version': self.version,
+            'dim': self.dim,
+            'rows': self.rows,
+            'entries': self.entries,
+            'files': self.files
+        }
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
\ No newline at end of file
@@ -1,27 +1,98 @@
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
 from .face_recognition import FaceRecognizer
+from .camera_state import CameraStates
+from .frame_context import FrameContext
+from .face_tracker import FaceTracker
+from .face_roi import ROIFaceDetector
+from .face_track_state import FaceTrackStates
+from .recognition_cache import RecognitionCache, face_quality
+from .object_detector import ObjectDetector
+from .inference_broker import InferenceBroker
 from .person_detector import PersonDetector
+from .person_tracker import PersonTracker
 from .weapon_detector import WeaponDetector
 from .mask_detector import MaskDetector
 from .anomaly_detector import AnomalyDetector
 from .pose_estimator import PoseEstimator
 from .liveness_detector import LivenessDetector
+from .stage_scheduler import StageScheduler, parse_stage_settings, critical_path
 
 class EnsembleClassifier:
     def __init__(self):
-        self.face_recognizer = FaceRecognizer()
-        self.person_detector = PersonDetector()
-        self.weapon_detector = WeaponDetector()
+        self.face_recognizer = FaceRecognizer.shared()
+        # One YOLO pass per frame feeds both the person and the weapon detector
+        self.object_detector = ObjectDetector.shared()
+        self.person_detector = PersonDetector(self.object_detector)
+        self.weapon_detector = WeaponDetector(self.object_detector)
+        # Cameras processed from separate threads share YOLO batches through the broker
+        self.inference_broker = None
+        if Config.INFERENCE_BATCH_ENABLED:
+            self.inference_broker = InferenceBroker.shared(self.object_detector)
         self.mask_detector = MaskDetector()
-        self.anomaly_detector = AnomalyDetector()
-        self.pose_estimator = PoseEstimator()
-        self.liveness_detector = LivenessDetector()
         
-        self.prev_faces = {}
+        # Background model, blink history, pose tracking and trackers are per camera
+        self.cameras = CameraStates(self._create_camera_state, on_evict=self._release_camera_state)
+        
+        # Stages in run order; pose reads the persons found by the objects stage
+        self.stages = [
+            ('objects', self._run_objects),
+            ('faces', self._run_faces),
+            ('anomaly', self._run_anomaly),
+            ('pose', self._run_pose)
+        ]
+        self.stage_dependencies = {'pose': ['objects']}
+        if Config.FACE_ROI_ENABLED:
+            # Faces are searched for inside the persons found by the objects stage
+            self.stage_dependencies['faces'] = ['objects']
+        self.stage_cadences = parse_stage_settings(Config.ENSEMBLE_STAGE_CADENCE)
+        self.stage_budgets = parse_stage_settings(Config.ENSEMBLE_STAGE_BUDGET)
+        
+        # Optional concurrent stages; the heavy work is native code that releases the GIL
+        self.stage_pool = None
+        if Config.ENSEMBLE_PARALLEL:
+            self.stage_pool = ThreadPoolExecutor(
+                max_workers=max(2, Config.ENSEMBLE_WORKERS), thread_name_prefix='ensemble-stage'
+            )
+        
         print("Ensemble classifier initialized with all models")
     
+    def _create_camera_state(self, camera_id):
+        """Stateful components for one camera"""
+        anomaly_detector = AnomalyDetector()
+        return {
+            'camera_id': camera_id,
+            'anomaly_detector': anomaly_detector,
+            # Shares the anomaly detector's background subtractor
+            'motion_gate': anomaly_detector.motion_gate,
+            'liveness_detector': LivenessDetector(),
+            'pose_estimator': PoseEstimator(),
+            'scheduler': StageScheduler(self.stage_cadences, self.stage_budgets),
+            'person_tracker': PersonTracker(),
+            'face_tracker': FaceTracker(),
+            'face_roi': ROIFaceDetector.new_state(),
+            'face_states': FaceTrackStates(),
+            'recognition_cache': RecognitionCache()
+        }
+    
+    def _release_camera_state(self, state):
+        state['pose_estimator'].close()
+    
     def process_frame(self, frame, camera_id):
         """Process frame through all models and return combined results"""
+        # Pick up face models retrained elsewhere, between frames
+        self.face_recognizer.refresh_models()
+        # Held for the whole frame, an eviction meanwhile cannot close models a stage is using
+        state = self.cameras.acquire(camera_id)
+        try:
+            return self._process_frame(frame, camera_id, state)
+        finally:
+            self.cameras.release(state)
+    
+    def _process_frame(self, frame, camera_id, state):
+        """Run the due stages on frame with its camera's state"""
         results = {
             'camera_id': camera_id,
             'frame_processed': True,
@@ -33,28 +104,196 @@ class EnsembleClassifier:
             'severity_score': 0
         }
         
-        # Detect persons
-        persons = self.person_detector.detect(frame)
+        motion_gate = state['motion_gate']
+        scheduler = state['scheduler']
+        
+        # Gray, HSV, RGB and downscaled copies are computed once and shared by every stage
+        context = FrameContext(frame)
+        
+        # Static scene: skip every model apart from periodic keep-alive frames
+        if Config.MOTION_GATE_ENABLED and not motion_gate.check(context):
+            results['frame_processed'] = False
+            results['motion_ratio'] = motion_gate.motion_ratio
+            return results
+        results['motion_ratio'] = motion_gate.measure(context)
+        
+        # Each stage runs at its own cadence and otherwise reuses its last output
+        scheduler.next_frame()
+        frame_start = time.time()
+        due = [(name, run) for name, run in self.stages if scheduler.is_due(name, frame_start)]
+        if self.stage_pool is None:
+            timings = {
+                name: self._execute_stage(name, run, context, state, frame_start)
+                for name, run in due
+            }
+        else:
+            timings = self._execute_stages_parallel(due, context, state, frame_start)
+        wall_ms = (time.time() - frame_start) * 1000
+        
+        path, path_ms = critical_path(timings, self.stage_dependencies, self.stage_pool is None)
+        results['timings'] = {
+            'parallel': self.stage_pool is not None,
+            'stages': timings,
+            'critical_path': path,
+            'critical_path_ms': path_ms,
+            'wall_ms': wall_ms
+        }
+        
+        # A stage that has not produced output yet (e.g. it failed in the pool) counts as empty
+        objects = scheduler.output('objects') or {'persons': [], 'weapons': [], 'alerts': []}
+        faces = scheduler.output('faces') or {'faces': [], 'alerts': []}
+        anomalies = scheduler.output('anomaly') or {'anomalies': [], 'alerts': []}
+        pose = scheduler.output('pose') or {'pose': None, 'alerts': []}
+        
+        persons = objects['persons']
         results['persons'] = persons
+        results['faces'] = faces['faces']
+        results['weapons'] = objects['weapons']
+        results['anomalies'] = anomalies['anomalies']
+        results['pose'] = pose['pose']
+        for output in (faces, objects, anomalies, pose):
+            results['alerts'].extend(output['alerts'])
+        # One-shot events are reported only on the frame their stage produced them
+        if 'objects' in timings:
+            results['alerts'].extend(objects.get('events', []))
+        results['staleness'] = scheduler.staleness()
         
-        # Detect faces
-        faces = self.face_recognizer.detect_faces(frame)
+        # Calculate overall severity
+        if results['alerts']:
+            results['severity_score'] = max(a['severity'] for a in results['alerts'])
         
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y+h, x:x+w]
-            
-            # Recognize face
-            label, confidence = self.face_recognizer.recognize(face_img)
+        # Person count alert
+        if len(persons) > 5:
+            results['alerts'].append({
+                'type': 'crowd_detected',
+                'severity': 6,
+                'description': f'{len(persons)} people detected in frame'
+            })
+        
+        return results
+    
+    def _execute_stage(self, name, run, context, state, frame_start, wait_for=()):
+        """Run one stage, record its output and return its timing relative to the frame start"""
+        for future in wait_for:
+            future.result()
+        
+        start = time.time()
+        output = run(context, state)
+        end = time.time()
+        state['scheduler'].record(name, output, end - start, end)
+        return {
+            'start_ms': (start - frame_start) * 1000,
+            'end_ms': (end - frame_start) * 1000,
+            'ms': (end - start) * 1000
+        }
+    
+    def _execute_stages_parallel(self, due, context, state, frame_start):
+        """Submit due stages to the pool; a stage starts once the due stages it depends on finished"""
+        futures = {}
+        for name, run in due:
+            wait_for = [futures[d] for d in self.stage_dependencies.get(name, []) if d in futures]
+            futures[name] = self.stage_pool.submit(
+                self._execute_stage, name, run, context, state, frame_start, wait_for
+            )
+        
+        timings = {}
+        for name, future in futures.items():
+            try:
+                timings[name] = future.result()
+            except Exception as e:
+                print(f"Ensemble stage {name} failed: {e}")
+        return timings
+    
+    def _run_objects(self, context, state):
+        """Person and weapon detection from one YOLO pass"""
+        # Run YOLO once; None when unavailable, each detector then uses its fallback
+        if self.inference_broker is not None:
+            detections = self.inference_broker.detect(state['camera_id'], context.frame)
+        else:
+            detections = self.object_detector.detect(context.frame)
+        
+        persons = self.person_detector.detect(context, detections)
+        weapons = self.weapon_detector.detect(context.frame, detections)
+        
+        events = self._track_persons(state, persons)
+        alerts = []
+        for weapon in weapons:
+            alerts.append({
+                'type': 'weapon_detected',
+                'severity': 10,
+                'description': f"WEAPON DETECTED: {weapon['class']} (confidence: {weapon['confidence']:.2f})"
+            })
+        
+        return {'persons': persons, 'weapons': weapons, 'alerts': alerts, 'events': events}
+    
+    def _track_persons(self, state, persons):
+        """Give persons stable track ids, velocity and dwell time; running and loitering events"""
+        tracker = state['person_tracker']
+        now = time.time()
+        tracks = tracker.update([person['bbox'] for person in persons], now)
+        
+        events = []
+        for person, track in zip(persons, tracks):
+            previous = tracker.previous(track)
+            is_running = previous is not None and self.person_detector.is_running(
+                track['bbox'], previous[1], now - previous[0]
+            )
+            person['track_id'] = track['id']
+            person['velocity'] = tracker.velocity(track)
+            person['dwell_time'] = tracker.dwell_time(track)
+            person['is_running'] = bool(is_running)
             
+            # Alert once when a track starts running or has stayed too long
+            if is_running and not track.get('running'):
+                events.append({
+                    'type': 'person_running',
+                    'severity': 4,
+                    'description': f"Person {track['id']} running"
+                })
+            track['running'] = is_running
+            if person['dwell_time'] >= Config.LOITERING_SECONDS and not track.get('loitering'):
+                track['loitering'] = True
+                events.append({
+                    'type': 'loitering',
+                    'severity': 5,
+                    'description': f"Person {track['id']} loitering for {person['dwell_time']:.0f}s"
+                })
+        return events
+    
+    def _run_faces(self, context, state):
+        """Face detection, recognition, mask and liveness checks"""
+        objects = state['scheduler'].output('objects')
+        person_boxes = [p['bbox'] for p in objects['persons']] if objects else None
+        
+        # Haar only every FACE_REDETECT_INTERVAL frames, faces are tracked in between
+        tracks = state['face_tracker'].update(
+            context.frame,
+            lambda f: self.face_recognizer.detect_faces(context, person_boxes, state['face_roi']),
+            context.gray
+        )
+        faces = [track['bbox'] for track in tracks]
+        frame = context.frame
+        face_imgs = [frame[y:y+h, x:x+w] for (x, y, w, h) in faces]
+        
+        # Recognize all faces in one batch, tracks with a still valid result are skipped
+        recognitions = self._recognize_tracks(state, tracks, face_imgs)
+        
+        states = state['face_states']
+        states.evict()
+        
+        face_results = []
+        alerts = []
+        for track, face_img, (label, confidence) in zip(tracks, face_imgs, recognitions):
+            x, y, w, h = track['bbox']
             # Check for mask
             mask_result = self.mask_detector.detect(face_img)
             
-            # Liveness check
-            prev_face = self.prev_faces.get(f"{x}_{y}", None)
-            liveness = self.liveness_detector.detect(face_img, prev_face)
-            self.prev_faces[f"{x}_{y}"] = face_img.copy()
+            # Liveness check against this track's previous crop
+            liveness = state['liveness_detector'].detect(face_img, states.last_crop(track['id']))
+            states.update(track['id'], face_img, liveness, (label, confidence))
             
             face_data = {
+                'track_id': track['id'],
                 'bbox': (x, y, w, h),
                 'label': label,
                 'confidence': confidence,
@@ -63,7 +302,7 @@ class EnsembleClassifier:
                 'is_live': liveness['is_live'],
                 'liveness_confidence': liveness['confidence']
             }
-            results['faces'].append(face_data)
+            face_results.append(face_data)
             
             # Generate alerts for unknown/intruders
             if label == 'unknown' and confidence > 0.3:
@@ -78,61 +317,68 @@ class EnsembleClassifier:
                 if not liveness['is_live']:
                     alert['severity'] += 1
                     alert['description'] += ' - POSSIBLE SPOOFING'
-                results['alerts'].append(alert)
-        
-        # Detect weapons
-        weapons = self.weapon_detector.detect(frame)
-        results['weapons'] = weapons
-        
-        if weapons:
-            for weapon in weapons:
-                results['alerts'].append({
-                    'type': 'weapon_detected',
-                    'severity': 10,
-                    'description': f"WEAPON DETECTED: {weapon['class']} (confidence: {weapon['confidence']:.2f})"
-                })
+                alerts.append(alert)
+        
+        return {'faces': face_results, 'alerts': alerts}
+    
+    def _recognize_tracks(self, state, tracks, face_imgs):
+        """(label, confidence) per face, reusing each track's cached result while it is valid"""
+        if not Config.RECOGNITION_CACHE_ENABLED:
+            return self.face_recognizer.recognize_batch(face_imgs)
         
-        # Detect anomalies
-        anomalies = self.anomaly_detector.detect_anomalies(frame)
-        results['anomalies'] = anomalies
+        cache = state['recognition_cache']
+        # Tracks briefly out of view keep their result, they may be re-associated
+        cache.prune([track['id'] for track in tracks] + list(state['face_tracker'].missing))
+        models = self.face_recognizer.models
+        qualities = [face_quality(face_img) for face_img in face_imgs]
+        recognitions = [
+            cache.get(track['id'], quality, models) for track, quality in zip(tracks, qualities)
+        ]
         
+        misses = [i for i, recognition in enumerate(recognitions) if recognition is None]
+        fresh = self.face_recognizer.recognize_batch([face_imgs[i] for i in misses])
+        for i, recognition in zip(misses, fresh):
+            recognitions[i] = recognition
+            cache.put(tracks[i]['id'], recognition, qualities[i], models)
+        return recognitions
+    
+    def _run_anomaly(self, context, state):
+        """Frozen feed, obstruction, motion, scene change and smoke checks"""
+        anomalies = state['anomaly_detector'].detect_anomalies(context)
+        
+        alerts = []
         for anomaly in anomalies:
-            results['alerts'].append({
+            alerts.append({
                 'type': anomaly['type'],
                 'severity': 8 if anomaly['severity'] == 'high' else 5,
                 'description': anomaly['description']
             })
         
-        # Pose estimation for detected persons
-        if persons:
-            pose_result = self.pose_estimator.estimate(frame)
-            if pose_result:
-                if pose_result['is_crouching']:
-                    results['alerts'].append({
-                        'type': 'suspicious_pose',
-                        'severity': 6,
-                        'description': 'Crouching behavior detected'
-                    })
-                if pose_result['is_crawling']:
-                    results['alerts'].append({
-                        'type': 'suspicious_pose',
-                        'severity': 7,
-                        'description': 'Crawling behavior detected'
-                    })
-        
-        # Calculate overall severity
-        if results['alerts']:
-            results['severity_score'] = max(a['severity'] for a in results['alerts'])
+        return {'anomalies': anomalies, 'alerts': alerts}
+    
+    def _run_pose(self, context, state):
+        """Pose estimation, only while the latest person detection found someone"""
+        objects = state['scheduler'].output('objects')
+        if not objects or not objects['persons']:
+            return {'pose': None, 'alerts': []}
         
-        # Person count alert
-        if len(persons) > 5:
-            results['alerts'].append({
-                'type': 'crowd_detected',
-                'severity': 6,
-                'description': f'{len(persons)} people detected in frame'
-            })
+        pose_result = state['pose_estimator'].estimate(context)
+        alerts = []
+        if pose_result:
+            if pose_result['is_crouching']:
+                alerts.append({
+                    'type': 'suspicious_pose',
+                    'severity': 6,
+                    'description': 'Crouching behavior detected'
+                })
+            if pose_result['is_crawling']:
+                alerts.append({
+                    'type': 'suspicious_pose',
+                    'severity': 7,
+                    'description': 'Crawling behavior detected'
+                })
         
-        return results
+        return {'pose': pose_result, 'alerts': alerts}
     
     def get_severity_label(self, score):
         """Convert severity score to label"""
@@ -0,0 +1,154 @@
+#face_ann_index.py
+import os
+import numpy as np
+
+class IVFIndex:
+    """Inverted-file (IVF) approximate nearest-neighbour index over FaceGallery rows"""
+    
+    # Rows are bucketed by their nearest k-means centroid and a query only scans
+    # the nprobe closest buckets. Vectors stay in the gallery, lists hold row ids.
+    def __init__(self, nlist=None, nprobe=8, n_iter=8, seed=42):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self._centroid_sq_norms = None
+        self.lists = []
+        self.size = 0
+    
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+    
+    def copy(self):
+        """Index sharing the centroids with its own inverted lists, for copy-on-write galleries"""
+        index = IVFIndex(self.nlist, self.nprobe, self.n_iter, self.seed)
+        index.centroids = self.centroids
+        index._centroid_sq_norms = self._centroid_sq_norms
+        index.lists = list(self.lists)  # add() and remove() replace lists, never modify them
+        index.size = self.size
+        return index
+    
+    def reset(self):
+        """Forget centroids and lists, build() must be called again"""
+        self.centroids = None
+        self._centroid_sq_norms = None
+        self.lists = []
+        self.size = 0
+    
+    def build(self, embeddings):
+        """Train centroids on embeddings and bucket every row"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n = len(embeddings)
+        nlist = self.nlist or int(4 * np.sqrt(n))
+        nlist = max(1, min(nlist, n))
+        
+        self.centroids = self._kmeans(embeddings, nlist)
+        self._centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+        self.lists = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self.size = 0
+        self.add(embeddings)
+    
+    def add(self, embeddings):
+        """Bucket new rows, numbered after the rows already indexed"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not self.is_trained or len(embeddings) == 0:
+            return
+        
+        assignments = self._nearest(embeddings, self.centroids, 1, self._centroid_sq_norms)[:, 0]
+        ids = np.arange(self.size, self.size + len(embeddings))
+        for c in np.unique(assignments):
+            self.lists[c] = np.concatenate([self.lists[c], ids[assignments == c]])
+        self.size += len(embeddings)
+    
+    def remove(self, keep):
+        """Drop rows where keep is False and renumber the rest to match the compacted gallery"""
+        keep = np.asarray(keep, dtype=bool)
+        new_ids = np.cumsum(keep) - 1
+        self.lists = [new_ids[ids[keep[ids]]] for ids in self.lists]
+        self.size = int(keep.sum())
+    
+    def search(self, queries, data, sq_norms, k=1):
+        """Return (distances, indices) of the approximate k nearest rows of data"""
+        queries = np.asarray(queries, dtype=np.float32)
+        nprobe = max(1, min(self.nprobe, len(self.centroids)))
+        probes = self._nearest(queries, self.centroids, nprobe, self._centroid_sq_norms)
+        
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.intp)
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([self.lists[c] for c in probes[i]])
+            if len(candidates) == 0:
+                continue
+            
+            sq_dists = sq_norms[candidates] - 2 * (data[candidates] @ query) + query @ query
+            np.maximum(sq_dists, 0, out=sq_dists)
+            
+            n = min(k, len(candidates))
+            best = np.argpartition(sq_dists, n - 1)[:n] if n < len(candidates) else np.arange(n)
+            best = best[np.argsort(sq_dists[best])]
+            distances[i, :n] = np.sqrt(sq_dists[best])
+            indices[i, :n] = candidates[best]
+        
+        return distances, indices
+    
+    @staticmethod
+    def _nearest(vectors, centroids, n, centroid_sq_norms=None):
+        """Ids of the n closest centroids for each vector"""
+        if centroid_sq_norms is None:
+            centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+        sq_dists = centroid_sq_norms[None, :] - 2 * (vectors @ centroids.T)
+        if n >= sq_dists.shape[1]:
+            return np.argsort(sq_dists, axis=1)
+        nearest = np.argpartition(sq_dists, n - 1, axis=1)[:, :n]
+        order = np.argsort(np.take_along_axis(sq_dists, nearest, axis=1), axis=1)
+        return np.take_along_axis(nearest, order, axis=1)
+    
+    def _kmeans(self, embeddings, nlist, max_train=64):
+        """Lloyd's k-means on a subsample of at most max_train points per centroid"""
+        rng = np.random.default_rng(self.seed)
+        sample = embeddings
+        if len(embeddings) > nlist * max_train:
+            sample = embeddings[rng.choice(len(embeddings), nlist * max_train, replace=False)]
+        
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assignments = self._nearest(sample, centroids, 1)[:, 0]
+            
+            # Per-cluster means via one reduceat over the points sorted by cluster
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=nlist)
+            filled = counts > 0
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            
+            # Empty clusters keep their previous centroid
+            centroids[filled] = sums / counts[filled, None]
+        
+        return centroids
+    
+    def save(self, path):
+        """Persist centroids and inverted lists to an .npz file"""
+        offsets = np.cumsum([0] + [len(l) for l in self.lists])
+        ids = np.concatenate(self.lists) if self.lists else np.zeros(0, dtype=np.int64)
+        tmp_path = path + '.tmp.npz'
+        np.savez(
+            tmp_path, centroids=self.centroids, ids=ids, offsets=offsets,
+            size=self.size, nprobe=self.nprobe
+        )
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path, nprobe=None):
+        """Load an index written by save()"""
+        with np.load(path) as data:
+            index = cls(nprobe=int(nprobe or data['nprobe']))
+            index.centroids = data['centroids']
+            index._centroid_sq_norms = np.einsum('ij,ij->i', index.centroids, index.centroids)
+            offsets = data['offsets']
+            ids = data['ids']
+            index.lists = [ids[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            index.nlist = len(index.lists)
+            index.size = int(data['size'])
+        return index
\ No newline at end of file
@@ -0,0 +1,197 @@
+#face_gallery.py
+import numpy as np
+
+class FaceGallery:
+    """Growable float32 matrix of known face embeddings with nearest-neighbour search"""
+    
+    # A gallery already being searched (e.g. the active FaceModelSet's) is never
+    # modified: change a copy() and publish that instead. Copies share the buffers, which
+    # only ever grow at the end. Rows [0, size) of a gallery never change, so add() on
+    # the copy holding the newest row writes in place and costs only the new rows; any
+    # other copy moves to buffers of its own first.
+    def __init__(self, capacity=256, index=None, ann_min_size=0):
+        self.initial_capacity = capacity
+        self.index = index  # optional approximate index, e.g. IVFIndex
+        self.ann_min_size = ann_min_size
+        self._labels = []
+        self._data = None
+        self._sq_norms = None
+        self._size = 0
+        self._rows = [0]  # rows written to the shared buffers, shared by every copy
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def dim(self):
+        return None if self._data is None else self._data.shape[1]
+    
+    @property
+    def labels(self):
+        """Label of each stored row"""
+        if len(self._labels) == self._size:
+            return self._labels
+        # A later copy appended to the shared list
+        return self._labels[:self._size]
+    
+    @property
+    def embeddings(self):
+        """View of the stored embeddings, one row per known image"""
+        if self._data is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._data[:self._size]
+    
+    def copy(self):
+        """Gallery with the same rows and labels that can be changed without affecting this one"""
+        gallery = FaceGallery(
+            capacity=self.initial_capacity,
+            index=None if self.index is None else self.index.copy(),
+            ann_min_size=self.ann_min_size
+        )
+        gallery._data = self._data
+        gallery._sq_norms = self._sq_norms
+        gallery._labels = self._labels
+        gallery._size = self._size
+        gallery._rows = self._rows
+        return gallery
+    
+    def clear(self):
+        """Drop all stored embeddings"""
+        self._labels = []
+        self._data = None
+        self._sq_norms = None
+        self._size = 0
+        self._rows = [0]
+        if self.index is not None:
+            self.index.reset()
+    
+    def set(self, embeddings, labels):
+        """Replace the gallery contents"""
+        self.clear()
+        self.add(embeddings, labels)
+    
+    def wrap(self, embeddings, sq_norms, labels):
+        """Use existing (e.g. memory-mapped, read-only) arrays as the gallery without copying"""
+        self.clear()
+        if len(labels) == 0:
+            return
+        self._data = embeddings
+        self._sq_norms = sq_norms
+        self._size = len(labels)
+        self._rows = [self._size]
+        self._labels = list(labels)
+    
+    @property
+    def sq_norms(self):
+        if self._sq_norms is None:
+            return np.zeros(0, dtype=np.float32)
+        return self._sq_norms[:self._size]
+    
+    def add(self, embeddings, labels):
+        """Append embeddings (one row each) with their labels"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.size == 0:
+            return
+        embeddings = embeddings.reshape(len(labels), -1)
+        
+        self._reserve(self._size + len(embeddings), embeddings.shape[1])
+        
+        end = self._size + len(embeddings)
+        self._data[self._size:end] = embeddings
+        self._sq_norms[self._size:end] = np.einsum('ij,ij->i', embeddings, embeddings)
+        self._labels.extend(labels)
+        self._size = end
+        self._rows[0] = end
+        
+        if self.index is not None and self.index.is_trained:
+            self.index.add(embeddings)
+    
+    def remove_label(self, label):
+        """Drop every row stored under label, returns the number of rows removed"""
+        keep = np.array([l != label for l in self.labels], dtype=bool)
+        removed = int(self._size - keep.sum())
+        if removed == 0:
+            return 0
+        
+        # Rows of the shared buffers never change, the kept rows move to new ones
+        self._labels = [l for l, k in zip(self.labels, keep) if k]
+        self._data = self._data[:self._size][keep]
+        self._sq_norms = self._sq_norms[:self._size][keep]
+        self._size = len(self._data)
+        self._rows = [self._size]
+        
+        if self.index is not None and self.index.is_trained:
+            self.index.remove(keep)
+        return removed
+    
+    def build_index(self):
+        """(Re)train the approximate index on the current embeddings"""
+        if self.index is not None and self._size > 0:
+            self.index.build(self.embeddings)
+    
+    def uses_index(self):
+        """Whether search() currently goes through the approximate index"""
+        return (
+            self.index is not None and self.index.is_trained
+            and self.index.size == self._size and self._size >= self.ann_min_size
+        )
+    
+    def _reserve(self, size, dim):
+        """Grow the preallocated buffers geometrically to hold at least size rows"""
+        if self._data is None:
+            capacity = max(self.initial_capacity, size)
+            self._data = np.zeros((capacity, dim), dtype=np.float32)
+            self._sq_norms = np.zeros(capacity, dtype=np.float32)
+            self._labels = []
+            self._rows = [0]
+            return
+        
+        if dim != self._data.shape[1]:
+            raise ValueError(f"Embedding size {dim} does not match gallery size {self._data.shape[1]}")
+        
+        # Append in place only behind the newest row; wrapped read-only buffers and
+        # buffers another copy has appended to are copied into a fresh growable buffer
+        owns_tail = self._rows[0] == self._size and self._data.flags.writeable
+        if size <= len(self._data) and owns_tail:
+            return
+        
+        capacity = max(size, 2 * len(self._data))
+        data = np.zeros((capacity, dim), dtype=np.float32)
+        data[:self._size] = self._data[:self._size]
+        sq_norms = np.zeros(capacity, dtype=np.float32)
+        sq_norms[:self._size] = self._sq_norms[:self._size]
+        self._data = data
+        self._sq_norms = sq_norms
+        self._labels = self._labels[:self._size]
+        self._rows = [self._size]
+    
+    def search(self, queries, k=1, exact=False):
+        """Return (distances, indices) of the k nearest embeddings for each query row"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self._size == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.intp)
+        
+        k = min(k, self._size)
+        
+        if not exact and self.uses_index():
+            return self.index.search(
+                queries, self._data[:self._size], self._sq_norms[:self._size], k
+            )
+        
+        # |q - x|^2 = |q|^2 + |x|^2 - 2 q.x, with the cross term as one matmul
+        sq_dists = queries @ self._data[:self._size].T
+        sq_dists *= -2
+        sq_dists += self._sq_norms[:self._size]
+        sq_dists += np.einsum('ij,ij->i', queries, queries)[:, None]
+        np.maximum(sq_dists, 0, out=sq_dists)
+        
+        if k == 1:
+            indices = np.argmin(sq_dists, axis=1)[:, None]
+        else:
+            indices = np.argpartition(sq_dists, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(sq_dists, indices, axis=1), axis=1)
+            indices = np.take_along_axis(indices, order, axis=1)
+        
+        distances = np.sqrt(np.take_along_axis(sq_dists, indices, axis=1))
+        return distances, indices
\ No newline at end of file
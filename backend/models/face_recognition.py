@@ -3,74 +3,285 @@ import cv2
 import numpy as np
 import os
 import pickle
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from config import Config
+from .face_gallery import FaceGallery
+from .face_ann_index import IVFIndex
+from .embedding_cache import EmbeddingCache
+from .model_bundle import ModelBundle
+from .face_roi import ROIFaceDetector
+from .frame_context import FrameContext
+
+# Bump whenever extract_embedding changes so cached embeddings are recomputed
+EMBEDDING_VERSION = f'lbp8-hog16x9-v1-{Config.FACE_SIZE[0]}x{Config.FACE_SIZE[1]}'
+
+class FaceModelSet:
+    """One generation of classifiers and gallery, always replaced as a whole"""
+    def __init__(self, gallery, svm_model=None, knn_model=None, rf_model=None,
+                 label_encoder=None, generation=None):
+        self.gallery = gallery
+        self.svm_model = svm_model
+        self.knn_model = knn_model
+        self.rf_model = rf_model
+        self.label_encoder = label_encoder if label_encoder is not None else LabelEncoder()
+        self.generation = generation
+        self.loaded_at = time.time()
+    
+    def with_changes(self, **changes):
+        """New model set with some parts replaced, this one stays untouched"""
+        fields = {
+            'gallery': self.gallery,
+            'svm_model': self.svm_model,
+            'knn_model': self.knn_model,
+            'rf_model': self.rf_model,
+            'label_encoder': self.label_encoder,
+            'generation': self.generation
+        }
+        fields.update(changes)
+        return FaceModelSet(**fields)
 
 class FaceRecognizer:
+    _shared = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         self.haar_cascade = cv2.CascadeClassifier(
             os.path.join(Config.HAARCASCADES_DIR, 'haarcascade_frontalface_default.xml')
         )
+        self.face_roi = ROIFaceDetector(self.haar_cascade)
         self.face_size = Config.FACE_SIZE
         self.threshold = Config.FACE_CONFIDENCE_THRESHOLD
         
-        # Models
-        self.svm_model = None
-        self.knn_model = None
-        self.rf_model = None
-        self.label_encoder = LabelEncoder()
-        
-        # Embeddings storage
-        self.known_embeddings = []
-        self.known_labels = []
+        # Active model set; replaced by reference so inference never takes a lock. Writers
+        # build a new set under _models_lock, so concurrent updates do not drop each other.
+        self.models = FaceModelSet(self._create_gallery())
+        self._models_lock = threading.Lock()
+        self._models_epoch = 0  # bumped by every add_face/remove_person, checked before a refit swaps
+        self.embedding_cache = EmbeddingCache(Config.TRAINED_MODELS_DIR, EMBEDDING_VERSION)
+        
+        # Versioned model bundle on disk, polled for generations saved by other instances
+        self.model_bundle = ModelBundle(os.path.join(Config.TRAINED_MODELS_DIR, 'face_bundles'))
+        # _pending_models/_loading_generation are shared with the loader thread; _refresh_lock is
+        # only held for the check-and-set, never across a load or save like _models_lock
+        self._refresh_lock = threading.Lock()
+        self._pending_models = None
+        self._loading_generation = None
+        self._last_poll = 0.0
+        
+        # Background SVM/RF refits after enrollment, coalesced into one job per burst
+        self._train_lock = threading.Lock()
+        self._retrain_lock = threading.Lock()
+        self._retrain_timer = None
+        self._retrain_running = False
+        self._retrain_requested = False
         
         self._load_models()
     
+    @classmethod
+    def shared(cls):
+        """Process-wide instance, so training, enrollment and live recognition see one model set"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    @property
+    def gallery(self):
+        return self.models.gallery
+    
+    @property
+    def svm_model(self):
+        return self.models.svm_model
+    
+    @property
+    def knn_model(self):
+        return self.models.knn_model
+    
+    @property
+    def rf_model(self):
+        return self.models.rf_model
+    
+    @property
+    def label_encoder(self):
+        return self.models.label_encoder
+    
+    @property
+    def generation(self):
+        """Bundle generation of the active model set, None if it was never saved"""
+        return self.models.generation
+    
+    @property
+    def known_embeddings(self):
+        """Known face embeddings as a float32 matrix"""
+        return self.gallery.embeddings
+    
+    @property
+    def known_labels(self):
+        """Label of each row in known_embeddings"""
+        return self.gallery.labels
+    
+    def _create_ann_index(self):
+        """Create the optional approximate index for the distance matcher"""
+        if not Config.FACE_ANN_ENABLED:
+            return None
+        return IVFIndex(nlist=Config.FACE_ANN_NLIST or None, nprobe=Config.FACE_ANN_NPROBE)
+    
+    def _create_gallery(self):
+        return FaceGallery(index=self._create_ann_index(), ann_min_size=Config.FACE_ANN_MIN_SIZE)
+    
     def _load_models(self):
         """Load pre-trained models if available"""
         try:
-            svm_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_svm.pkl')
-            if os.path.exists(svm_path):
-                with open(svm_path, 'rb') as f:
-                    self.svm_model = pickle.load(f)
-            
-            knn_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_knn.pkl')
-            if os.path.exists(knn_path):
-                with open(knn_path, 'rb') as f:
-                    self.knn_model = pickle.load(f)
-            
-            rf_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_rf.pkl')
-            if os.path.exists(rf_path):
-                with open(rf_path, 'rb') as f:
-                    self.rf_model = pickle.load(f)
-            
-            embeddings_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_embeddings.pkl')
-            if os.path.exists(embeddings_path):
-                with open(embeddings_path, 'rb') as f:
-                    data = pickle.load(f)
-                    self.known_embeddings = data['embeddings']
-                    self.known_labels = data['labels']
-            
-            encoder_path = os.path.join(Config.TRAINED_MODELS_DIR, 'label_encoder.pkl')
-            if os.path.exists(encoder_path):
-                with open(encoder_path, 'rb') as f:
-                    self.label_encoder = pickle.load(f)
-                    
+            bundle = self.model_bundle.load()
+            if bundle is None:
+                self._load_legacy_models()
+            else:
+                self.models = self._models_from_bundle(bundle)
             print("Face recognition models loaded successfully")
         except Exception as e:
             print(f"Error loading models: {e}")
     
-    def detect_faces(self, frame):
-        """Detect faces in frame using Haar Cascade"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.haar_cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+    def _models_from_bundle(self, bundle):
+        """Build a model set from a loaded bundle; the gallery maps its embeddings read-only"""
+        if bundle['manifest'].get('embedding_version') != EMBEDDING_VERSION:
+            print("Face model bundle was built with another feature extractor, retrain recommended")
+        
+        classifiers = bundle['classifiers']
+        gallery = self._create_gallery()
+        gallery.wrap(bundle['embeddings'], bundle['sq_norms'], bundle['labels'])
+        self._attach_index(gallery, bundle['index'])
+        
+        return FaceModelSet(
+            gallery,
+            svm_model=classifiers['svm'],
+            knn_model=classifiers['knn'],
+            rf_model=classifiers['rf'],
+            label_encoder=classifiers['label_encoder'],
+            generation=bundle['generation']
         )
-        return faces
+    
+    def _attach_index(self, gallery, index):
+        """Use a persisted ANN index if it matches the gallery, otherwise rebuild it"""
+        if gallery.index is None:
+            return
+        if index is not None and index.size == len(gallery):
+            index.nprobe = Config.FACE_ANN_NPROBE
+            gallery.index = index
+        else:
+            gallery.build_index()
+    
+    def _load_legacy_models(self):
+        """Load the separate pickle files written before model bundles existed"""
+        models = FaceModelSet(self._create_gallery())
+        
+        svm_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_svm.pkl')
+        if os.path.exists(svm_path):
+            with open(svm_path, 'rb') as f:
+                models.svm_model = pickle.load(f)
+        
+        knn_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_knn.pkl')
+        if os.path.exists(knn_path):
+            with open(knn_path, 'rb') as f:
+                models.knn_model = pickle.load(f)
+        
+        rf_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_rf.pkl')
+        if os.path.exists(rf_path):
+            with open(rf_path, 'rb') as f:
+                models.rf_model = pickle.load(f)
+        
+        embeddings_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_embeddings.pkl')
+        if os.path.exists(embeddings_path):
+            with open(embeddings_path, 'rb') as f:
+                data = pickle.load(f)
+                models.gallery.set(data['embeddings'], list(data['labels']))
+        
+        index = None
+        index_path = os.path.join(Config.TRAINED_MODELS_DIR, 'face_ann_index.npz')
+        if models.gallery.index is not None and os.path.exists(index_path):
+            index = IVFIndex.load(index_path)
+        self._attach_index(models.gallery, index)
+        
+        encoder_path = os.path.join(Config.TRAINED_MODELS_DIR, 'label_encoder.pkl')
+        if os.path.exists(encoder_path):
+            with open(encoder_path, 'rb') as f:
+                models.label_encoder = pickle.load(f)
+        
+        self.models = models
+    
+    def refresh_models(self):
+        """Swap in a newer saved generation if one is ready; call between frames"""
+        with self._refresh_lock:
+            pending, self._pending_models = self._pending_models, None
+        if pending is not None:
+            with self._models_lock:
+                # The model set may have moved past it (a local save) while it loaded
+                if self._is_newer(pending.generation):
+                    self.models = pending
+                    print(f"Face models switched to generation {pending.generation}")
+                    return True
+        
+        now = time.time()
+        if now - self._last_poll < Config.FACE_MODEL_POLL_INTERVAL:
+            return False
+        self._last_poll = now
+        
+        latest = self.model_bundle.current_generation()
+        if latest is None or not self._is_newer(latest):
+            return False
+        with self._refresh_lock:
+            if self._loading_generation is not None:
+                return False
+            self._loading_generation = latest
+        
+        # Load off the frame loop; the next call after it finishes does the swap
+        threading.Thread(target=self._load_generation, args=(latest,), daemon=True).start()
+        return False
+    
+    def _load_generation(self, generation):
+        try:
+            bundle = self.model_bundle.load(generation)
+            if bundle is not None:
+                models = self._models_from_bundle(bundle)
+                with self._refresh_lock:
+                    pending = self._pending_models
+                    # A slow load of an older generation must not replace a newer one
+                    if pending is None or models.generation > pending.generation:
+                        self._pending_models = models
+        except Exception as e:
+            print(f"Error loading face model generation {generation}: {e}")
+        finally:
+            with self._refresh_lock:
+                self._loading_generation = None
+    
+    def _is_newer(self, generation):
+        """Whether generation is newer than the active model set's"""
+        current = self.generation
+        return generation is not None and (current is None or generation > current)
+    
+    def get_model_status(self):
+        """Active and latest saved model generation"""
+        models = self.models
+        return {
+            'generation': models.generation,
+            'latest_generation': self.model_bundle.current_generation(),
+            'loading_generation': self._loading_generation,
+            'loaded_at': models.loaded_at,
+            'gallery_size': len(models.gallery),
+            'classes': [str(c) for c in getattr(models.label_encoder, 'classes_', [])]
+        }
+    
+    def detect_faces(self, frame, person_boxes=None, roi_state=None):
+        """Detect faces in frame using Haar Cascade, only near person_boxes when ROI mode is on"""
+        context = FrameContext.of(frame)
+        return self.face_roi.detect(context.frame, person_boxes, context.gray, roi_state)
     
     def extract_embedding(self, face_image):
         """Extract face embedding using histogram-based features"""
@@ -80,7 +291,7 @@ class FaceRecognizer:
         
         # Compute LBP histogram
         lbp = self._compute_lbp(gray)
-        hist_lbp, _ = np.histogram(lbp.ravel(), bins=256, range=(0, 256))
+        hist_lbp = np.bincount(lbp.ravel(), minlength=256)
         
         # Compute HOG-like features
         hog = self._compute_hog(gray)
@@ -95,21 +306,31 @@ class FaceRecognizer:
         """Compute Local Binary Pattern"""
         rows, cols = image.shape
         lbp = np.zeros_like(image, dtype=np.uint8)
+        if rows <= 2 * radius or cols <= 2 * radius:
+            return lbp
         
-        for i in range(radius, rows - radius):
-            for j in range(radius, cols - radius):
-                center = image[i, j]
-                code = 0
-                for k in range(neighbors):
-                    angle = 2 * np.pi * k / neighbors
-                    x = int(round(i + radius * np.cos(angle)))
-                    y = int(round(j - radius * np.sin(angle)))
-                    if image[x, y] >= center:
-                        code |= (1 << k)
-                lbp[i, j] = code
+        # Compare every interior pixel against each shifted neighbour at once
+        center = image[radius:rows - radius, radius:cols - radius]
+        codes = np.zeros(center.shape, dtype=np.uint8)
+        for k, (dx, dy) in enumerate(self._lbp_offsets(radius, neighbors)):
+            neighbour = image[radius + dx:rows - radius + dx, radius + dy:cols - radius + dy]
+            codes |= (neighbour >= center).astype(np.uint8) << k
+        lbp[radius:rows - radius, radius:cols - radius] = codes
         
         return lbp
     
+    @staticmethod
+    def _lbp_offsets(radius, neighbors):
+        """Integer (row, col) offsets of the LBP sampling points"""
+        offsets = []
+        for k in range(neighbors):
+            angle = 2 * np.pi * k / neighbors
+            offsets.append((
+                int(round(radius * np.cos(angle))),
+                int(round(-radius * np.sin(angle)))
+            ))
+        return offsets
+    
     def _compute_hog(self, image, cell_size=16, bins=9):
         """Compute HOG features"""
         # Compute gradients
@@ -119,67 +340,118 @@ class FaceRecognizer:
         magnitude = np.sqrt(gx**2 + gy**2)
         angle = np.arctan2(gy, gx) * (180 / np.pi) % 180
         
-        # Compute histogram for each cell
+        # Cells start every cell_size pixels, the trailing partial cell is skipped
         h, w = image.shape
-        features = []
-        
-        for i in range(0, h - cell_size, cell_size):
-            for j in range(0, w - cell_size, cell_size):
-                cell_mag = magnitude[i:i+cell_size, j:j+cell_size]
-                cell_angle = angle[i:i+cell_size, j:j+cell_size]
-                
-                hist, _ = np.histogram(
-                    cell_angle.ravel(), bins=bins, range=(0, 180),
-                    weights=cell_mag.ravel()
-                )
-                features.extend(hist)
+        cells_y = len(range(0, h - cell_size, cell_size))
+        cells_x = len(range(0, w - cell_size, cell_size))
+        if cells_y == 0 or cells_x == 0:
+            return np.zeros(0)
+        
+        magnitude = magnitude[:cells_y * cell_size, :cells_x * cell_size]
+        angle = angle[:cells_y * cell_size, :cells_x * cell_size]
+        
+        # Same bin edges as np.histogram(range=(0, 180)), right edge inclusive
+        edges = np.linspace(0, 180, bins + 1)
+        angle_bins = np.searchsorted(edges[1:-1], angle, side='right')
+        
+        # One weighted bincount over (cell, bin) pairs for the whole image
+        cell_rows = np.arange(angle.shape[0]) // cell_size
+        cell_cols = np.arange(angle.shape[1]) // cell_size
+        cell_ids = cell_rows[:, None] * cells_x + cell_cols[None, :]
+        hist = np.bincount(
+            (cell_ids * bins + angle_bins).ravel(),
+            weights=magnitude.ravel(),
+            minlength=cells_y * cells_x * bins
+        )
         
-        return np.array(features)
+        return hist
     
     def recognize(self, face_image):
         """Recognize face and return label with confidence"""
-        if self.svm_model is None and len(self.known_embeddings) == 0:
-            return "unknown", 0.0
+        return self.recognize_batch([face_image])[0]
+    
+    def recognize_batch(self, face_images):
+        """Recognize several faces at once, returning (label, confidence) per face"""
+        if len(face_images) == 0:
+            return []
         
-        embedding = self.extract_embedding(face_image)
+        # Read the model set once, a swap mid-batch cannot mix generations
+        models = self.models
+        gallery = models.gallery
+        label_encoder = models.label_encoder
         
-        results = []
+        if models.svm_model is None and len(gallery) == 0:
+            return [("unknown", 0.0) for _ in face_images]
         
-        # SVM prediction
-        if self.svm_model is not None:
-            try:
-                proba = self.svm_model.predict_proba([embedding])[0]
-                pred_idx = np.argmax(proba)
-                results.append(('svm', self.label_encoder.classes_[pred_idx], proba[pred_idx]))
-            except:
-                pass
+        embeddings = np.array([self.extract_embedding(face) for face in face_images])
         
-        # KNN prediction
-        if self.knn_model is not None:
-            try:
-                proba = self.knn_model.predict_proba([embedding])[0]
-                pred_idx = np.argmax(proba)
-                results.append(('knn', self.label_encoder.classes_[pred_idx], proba[pred_idx]))
-            except:
-                pass
+        results = [[] for _ in face_images]
         
-        # Random Forest prediction
-        if self.rf_model is not None:
+        # Classifier predictions, one predict_proba call per model for the whole batch
+        for method, model in (('svm', models.svm_model), ('knn', models.knn_model), ('rf', models.rf_model)):
+            if model is None:
+                continue
+            if method == 'knn':
+                self._knn_vote(gallery, model.n_neighbors, embeddings, results)
+                continue
             try:
-                proba = self.rf_model.predict_proba([embedding])[0]
-                pred_idx = np.argmax(proba)
-                results.append(('rf', self.label_encoder.classes_[pred_idx], proba[pred_idx]))
+                proba = model.predict_proba(embeddings)
             except:
-                pass
+                continue
+            pred_idx = np.argmax(proba, axis=1)
+            for i, idx in enumerate(pred_idx):
+                label = label_encoder.classes_[model.classes_[idx]]
+                results[i].append((method, label, proba[i, idx]))
         
         # Distance-based matching
-        if len(self.known_embeddings) > 0:
-            distances = [np.linalg.norm(embedding - known) for known in self.known_embeddings]
-            min_idx = np.argmin(distances)
-            min_dist = distances[min_idx]
-            confidence = max(0, 1 - min_dist)
-            results.append(('distance', self.known_labels[min_idx], confidence))
+        if len(gallery) > 0:
+            distances, indices = gallery.search(embeddings, k=1)
+            labels = gallery.labels
+            for i in range(len(embeddings)):
+                # The IVF index returns -1 when the probed lists held no candidate
+                if indices[i, 0] < 0:
+                    results[i].append(('distance', 'unknown', 0.0))
+                    continue
+                confidence = max(0, 1 - float(distances[i, 0]))
+                results[i].append(('distance', labels[indices[i, 0]], confidence))
         
+        return [self._vote(face_results) for face_results in results]
+    
+    def _knn_vote(self, gallery, n_neighbors, embeddings, results):
+        """KNN vote over the gallery, so enrollments count before the next refit"""
+        if len(gallery) == 0:
+            return
+        _, neighbours = gallery.search(embeddings, k=n_neighbors)
+        labels = gallery.labels
+        for i, row in enumerate(neighbours):
+            votes = Counter(labels[j] for j in row if j >= 0)
+            if votes:
+                label, count = votes.most_common(1)[0]
+                results[i].append(('knn', label, count / n_neighbors))
+    
+    def _embed_file(self, img_path):
+        """Decode and embed one training image, None if unreadable"""
+        img = cv2.imread(img_path)
+        if img is None:
+            return None
+        return self.extract_embedding(img).astype(np.float32)
+    
+    def _embed_files(self, img_paths):
+        """Yield (position, embedding) as images finish, using FACE_TRAIN_WORKERS threads"""
+        workers = min(Config.FACE_TRAIN_WORKERS, len(img_paths))
+        if workers <= 1:
+            for i, img_path in enumerate(img_paths):
+                yield i, self._embed_file(img_path)
+            return
+        
+        # OpenCV decode/resize/Sobel and most NumPy kernels release the GIL
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._embed_file, p): i for i, p in enumerate(img_paths)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def _vote(self, results):
+        """Combine per-method predictions for one face into a label and confidence"""
         if not results:
             return "unknown", 0.0
         
@@ -198,28 +470,63 @@ class FaceRecognizer:
         
         return best_label, avg_confidence
     
-    def train(self, train_dir=None):
+    def train(self, train_dir=None, callback=None):
         """Train face recognition models"""
+        with self._train_lock:
+            return self._train(train_dir, callback)
+    
+    def _train(self, train_dir=None, callback=None):
+        """Fit a new model set off to the side and swap it in when complete"""
         if train_dir is None:
             train_dir = Config.TRAIN_DIR
         
-        embeddings = []
-        labels = []
+        # Enrollments and removals after this point are not in the listing below
+        with self._models_lock:
+            epoch = self._models_epoch
         
+        image_paths = []
         for person_name in os.listdir(train_dir):
             person_dir = os.path.join(train_dir, person_name)
             if not os.path.isdir(person_dir):
                 continue
             
             for img_name in os.listdir(person_dir):
-                img_path = os.path.join(person_dir, img_name)
-                img = cv2.imread(img_path)
-                if img is None:
-                    continue
-                
-                embedding = self.extract_embedding(img)
-                embeddings.append(embedding)
-                labels.append(person_name)
+                image_paths.append((os.path.join(person_dir, img_name), person_name))
+        
+        # Only new or changed images are decoded and embedded
+        found = [self.embedding_cache.get(img_path) for img_path, _ in image_paths]
+        missing = [i for i, embedding in enumerate(found) if embedding is None]
+        
+        total = len(image_paths)
+        processed = total - len(missing)
+        if callback:
+            callback({'status': 'embedding', 'processed': processed, 'total': total})
+        
+        for i, embedding in self._embed_files([image_paths[i][0] for i in missing]):
+            idx = missing[i]
+            found[idx] = embedding
+            if embedding is not None:
+                self.embedding_cache.put(image_paths[idx][0], embedding)
+            processed += 1
+            if callback:
+                callback({'status': 'embedding', 'processed': processed, 'total': total})
+        
+        embeddings = []
+        labels = []
+        seen_paths = []
+        for (img_path, person_name), embedding in zip(image_paths, found):
+            if embedding is None:
+                continue
+            embeddings.append(embedding)
+            labels.append(person_name)
+            seen_paths.append(img_path)
+        new_embeddings = len([i for i in missing if found[i] is not None])
+        
+        self.embedding_cache.retain(train_dir, seen_paths)
+        self.embedding_cache.flush()
+        
+        if callback:
+            callback({'status': 'fitting', 'processed': processed, 'total': total})
         
         if len(embeddings) < 2:
             return False, "Need at least 2 images to train"
@@ -228,8 +535,9 @@ class FaceRecognizer:
         labels = np.array(labels)
         
         # Fit label encoder
-        self.label_encoder.fit(labels)
-        encoded_labels = self.label_encoder.transform(labels)
+        label_encoder = LabelEncoder()
+        label_encoder.fit(labels)
+        encoded_labels = label_encoder.transform(labels)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -237,72 +545,162 @@ class FaceRecognizer:
         )
         
         # Train SVM
-        self.svm_model = SVC(kernel='rbf', probability=True, C=1.0)
-        self.svm_model.fit(X_train, y_train)
-        svm_acc = self.svm_model.score(X_test, y_test) if len(X_test) > 0 else 0
+        svm_model = SVC(kernel='rbf', probability=True, C=1.0)
+        svm_model.fit(X_train, y_train)
+        svm_acc = svm_model.score(X_test, y_test) if len(X_test) > 0 else 0
         
-        # Train KNN
+        # Train KNN (its vote is taken over the gallery at recognition time)
         n_neighbors = min(5, len(X_train))
-        self.knn_model = KNeighborsClassifier(n_neighbors=n_neighbors)
-        self.knn_model.fit(X_train, y_train)
-        knn_acc = self.knn_model.score(X_test, y_test) if len(X_test) > 0 else 0
+        knn_model = KNeighborsClassifier(n_neighbors=n_neighbors)
+        knn_model.fit(X_train, y_train)
+        knn_acc = knn_model.score(X_test, y_test) if len(X_test) > 0 else 0
         
         # Train Random Forest
-        self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.rf_model.fit(X_train, y_train)
-        rf_acc = self.rf_model.score(X_test, y_test) if len(X_test) > 0 else 0
+        rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
+        rf_model.fit(X_train, y_train)
+        rf_acc = rf_model.score(X_test, y_test) if len(X_test) > 0 else 0
         
         # Store embeddings
-        self.known_embeddings = embeddings.tolist()
-        self.known_labels = labels.tolist()
+        gallery = self._create_gallery()
+        gallery.add(embeddings, labels.tolist())
+        gallery.build_index()
+        
+        # Swap in the new model set
+        models = FaceModelSet(
+            gallery,
+            svm_model=svm_model,
+            knn_model=knn_model,
+            rf_model=rf_model,
+            label_encoder=label_encoder
+        )
+        with self._models_lock:
+            stale = self._models_epoch != epoch
+            if not stale:
+                self.models = models
+                
+                # Save models
+                self._save_models(models)
         
-        # Save models
-        self._save_models()
+        if stale:
+            # Swapping would drop faces added, or bring back people removed, during the fit
+            self.schedule_retrain()
+            return False, "Faces changed during training, retrain scheduled"
         
         return True, {
             'svm_accuracy': svm_acc,
             'knn_accuracy': knn_acc,
             'rf_accuracy': rf_acc,
             'total_samples': len(embeddings),
-            'classes': list(self.label_encoder.classes_)
+            'new_embeddings': new_embeddings,
+            'classes': list(label_encoder.classes_)
         }
     
-    def _save_models(self):
-        """Save trained models"""
-        os.makedirs(Config.TRAINED_MODELS_DIR, exist_ok=True)
-        
-        if self.svm_model:
-            with open(os.path.join(Config.TRAINED_MODELS_DIR, 'face_svm.pkl'), 'wb') as f:
-                pickle.dump(self.svm_model, f)
-        
-        if self.knn_model:
-            with open(os.path.join(Config.TRAINED_MODELS_DIR, 'face_knn.pkl'), 'wb') as f:
-                pickle.dump(self.knn_model, f)
-        
-        if self.rf_model:
-            with open(os.path.join(Config.TRAINED_MODELS_DIR, 'face_rf.pkl'), 'wb') as f:
-                pickle.dump(self.rf_model, f)
-        
-        with open(os.path.join(Config.TRAINED_MODELS_DIR, 'face_embeddings.pkl'), 'wb') as f:
-            pickle.dump({'embeddings': self.known_embeddings, 'labels': self.known_labels}, f)
-        
-        with open(os.path.join(Config.TRAINED_MODELS_DIR, 'label_encoder.pkl'), 'wb') as f:
-            pickle.dump(self.label_encoder, f)
+    def _save_models(self, models):
+        """Save a model set as a new bundle generation"""
+        gallery = models.gallery
+        models.generation = self.model_bundle.save(
+            gallery.embeddings if len(gallery) > 0 else np.zeros((0, 0), dtype=np.float32),
+            gallery.sq_norms,
+            gallery.labels,
+            {
+                'svm': models.svm_model,
+                'knn': models.knn_model,
+                'rf': models.rf_model,
+                'label_encoder': models.label_encoder
+            },
+            index=gallery.index,
+            embedding_version=EMBEDDING_VERSION
+        )
     
     def add_face(self, name, images):
         """Add new face to the system (incremental learning)"""
         person_dir = os.path.join(Config.TRAIN_DIR, name)
         os.makedirs(person_dir, exist_ok=True)
         
+        embeddings = []
         for i, img in enumerate(images):
             img_path = os.path.join(person_dir, f'{name}_{i:03d}.jpg')
-            cv2.imwrite(img_path, img)
             
-            embedding = self.extract_embedding(img)
-            self.known_embeddings.append(embedding)
-            self.known_labels.append(name)
+            # Embed the encoded JPEG, as train() would when reading it back from disk
+            _, buffer = cv2.imencode('.jpg', img)
+            data = buffer.tobytes()
+            with open(img_path, 'wb') as f:
+                f.write(data)
+            
+            embedding = self.extract_embedding(cv2.imdecode(buffer, cv2.IMREAD_COLOR))
+            embedding = embedding.astype(np.float32)
+            self.embedding_cache.put(img_path, embedding, data=data)
+            embeddings.append(embedding)
+        
+        self.embedding_cache.flush()
         
-        # Retrain models incrementally
-        self.train()
+        # Recognition may be searching the active gallery, extend a copy and swap it in
+        if embeddings:
+            with self._models_lock:
+                self._models_epoch += 1
+                gallery = self.models.gallery.copy()
+                gallery.add(embeddings, [name] * len(embeddings))
+                self.models = self.models.with_changes(gallery=gallery)
+        
+        # Gallery and KNN already see the new images, refit SVM/RF in the background
+        self.schedule_retrain()
+        
+        return len(images)
+    
+    def schedule_retrain(self, delay=None):
+        """Refit the classifiers in the background; requests within one burst share a single refit"""
+        if delay is None:
+            delay = Config.FACE_RETRAIN_DELAY
+        
+        with self._retrain_lock:
+            if self._retrain_running:
+                # Picked up again once the running refit finishes
+                self._retrain_requested = True
+            elif self._retrain_timer is None:
+                self._start_retrain_timer(delay)
+    
+    def _start_retrain_timer(self, delay):
+        self._retrain_timer = threading.Timer(delay, self._run_retrain)
+        self._retrain_timer.daemon = True
+        self._retrain_timer.start()
+    
+    def _run_retrain(self):
+        with self._retrain_lock:
+            self._retrain_timer = None
+            self._retrain_running = True
+            self._retrain_requested = False
+        
+        try:
+            success, results = self.train()
+            if not success:
+                print(f"Background retrain skipped: {results}")
+        except Exception as e:
+            print(f"Background retrain failed: {e}")
+        finally:
+            with self._retrain_lock:
+                self._retrain_running = False
+                if self._retrain_requested:
+                    self._retrain_requested = False
+                    self._start_retrain_timer(Config.FACE_RETRAIN_DELAY)
+    
+    def remove_person(self, name):
+        """Drop a person from the gallery and embedding cache, refitting SVM/RF without them in the background"""
+        self.embedding_cache.drop(os.path.join(Config.TRAIN_DIR, name))
+        self.embedding_cache.flush()
+        
+        with self._models_lock:
+            self._models_epoch += 1
+            models = self.models
+            gallery = models.gallery.copy()
+            removed = gallery.remove_label(name)
+            known = name in getattr(models.label_encoder, 'classes_', [])
+            if not (removed or known):
+                return removed
+            
+            # SVM and RF still predict the removed class; until the refit only the gallery votes
+            models = models.with_changes(gallery=gallery, svm_model=None, rf_model=None, generation=None)
+            self.models = models
+            self._save_models(models)
         
-        return len(images)
\ No newline at end of file
+        self.schedule_retrain()
+        return removed
\ No newline at end of file
@@ -0,0 +1,93 @@
+#face_roi.py
+import cv2
+import numpy as np
+from config import Config
+
+def merge_rois(rois):
+    """Merge overlapping (x1, y1, x2, y2) rectangles until none overlap"""
+    rois = [list(r) for r in rois]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rois)):
+            for j in range(i + 1, len(rois)):
+                a, b = rois[i], rois[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rois[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del rois[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(r) for r in rois]
+
+def person_face_rois(person_boxes, frame_shape, upper=0.5, pad=0.1, min_size=30):
+    """Head regions of (x, y, w, h) person boxes: their upper part plus some padding, merged"""
+    h, w = frame_shape[:2]
+    rois = []
+    for (x, y, bw, bh) in person_boxes:
+        px, py = int(bw * pad), int(bh * pad)
+        x1, y1 = max(0, int(x) - px), max(0, int(y) - py)
+        x2, y2 = min(w, int(x + bw) + px), min(h, int(y + bh * upper) + py)
+        # A face smaller than the cascade's minimum size cannot be found anyway
+        if x2 - x1 >= min_size and y2 - y1 >= min_size:
+            rois.append((x1, y1, x2, y2))
+    return merge_rois(rois)
+
+class ROIFaceDetector:
+    """Haar face detection restricted to regions around detected persons"""
+    
+    # The full frame is still searched every full_frame_interval-th call, so faces
+    # whose person was missed are found within a bounded number of frames. One detector
+    # serves every camera; the call count lives in a per-camera state from new_state().
+    def __init__(self, cascade, scale_factor=1.1, min_neighbors=5, min_size=(30, 30),
+                 enabled=None, full_frame_interval=None, upper=None):
+        self.cascade = cascade
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+        self.enabled = Config.FACE_ROI_ENABLED if enabled is None else enabled
+        self.full_frame_interval = full_frame_interval or Config.FACE_ROI_FULL_FRAME_INTERVAL
+        self.upper = upper or Config.FACE_ROI_UPPER_FRACTION
+    
+    @staticmethod
+    def new_state():
+        """Per-camera search state for detect()"""
+        return {
+            'frames_since_full': None,  # None until the first full-frame search
+            'last_rois': []  # regions searched on the last call, empty after a full-frame search
+        }
+    
+    def _detect(self, gray):
+        return self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+            minSize=self.min_size
+        )
+    
+    def detect(self, frame, person_boxes=None, gray=None, state=None):
+        """(x, y, w, h) faces in frame coordinates; without person_boxes or a camera state the full frame is searched"""
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        
+        full_frame = (
+            not self.enabled or person_boxes is None or state is None
+            or state['frames_since_full'] is None
+            or state['frames_since_full'] + 1 >= self.full_frame_interval
+        )
+        if full_frame:
+            if state is not None:
+                state['frames_since_full'] = 0
+                state['last_rois'] = []
+            return self._detect(gray)
+        
+        state['frames_since_full'] += 1
+        rois = person_face_rois(person_boxes, gray.shape, self.upper, min_size=min(self.min_size))
+        state['last_rois'] = rois
+        faces = []
+        for (x1, y1, x2, y2) in rois:
+            found = self._detect(gray[y1:y2, x1:x2])
+            # Merged regions never overlap, so no face is found twice
+            faces.extend((fx + x1, fy + y1, fw, fh) for (fx, fy, fw, fh) in found)
+        if not faces:
+            return ()
+        return np.array(faces, dtype=np.int32)
\ No newline at end of file
@@ -0,0 +1,55 @@
+#face_track_state.py
+import time
+from collections import OrderedDict, deque
+from config import Config
+
+class FaceTrackStates:
+    """Bounded per-face-track state: last crop, liveness history and recognition result"""
+    
+    # Entries are keyed by FaceTracker track id. A track not seen for timeout seconds
+    # is evicted, and at most max_tracks entries are kept (least recently seen go first).
+    def __init__(self, timeout=None, max_tracks=None, history=None):
+        self.timeout = Config.FACE_TRACK_TIMEOUT if timeout is None else timeout
+        self.max_tracks = max_tracks or Config.FACE_TRACK_MAX
+        self.history = history or Config.FACE_LIVENESS_HISTORY
+        self.states = OrderedDict()  # track_id -> state, least recently seen first
+    
+    def get(self, track_id):
+        """State of a track, None for a track never seen"""
+        return self.states.get(track_id)
+    
+    def last_crop(self, track_id):
+        state = self.states.get(track_id)
+        return state['last_crop'] if state else None
+    
+    def update(self, track_id, face_img, liveness=None, recognition=None, now=None):
+        """Record this frame's crop and results for a track"""
+        now = time.time() if now is None else now
+        state = self.states.pop(track_id, None)
+        if state is None:
+            state = {
+                'first_seen': now,
+                'liveness': deque(maxlen=self.history),
+                'recognition': None
+            }
+        state['last_seen'] = now
+        state['last_crop'] = face_img.copy()  # the frame buffer is reused by the camera
+        if liveness is not None:
+            state['liveness'].append((liveness['is_live'], liveness['confidence']))
+        if recognition is not None:
+            state['recognition'] = recognition
+        self.states[track_id] = state
+        self.evict(now)
+        return state
+    
+    def evict(self, now=None):
+        """Drop tracks unseen for longer than the timeout, then the oldest above max_tracks"""
+        now = time.time() if now is None else now
+        while self.states:
+            track_id, state = next(iter(self.states.items()))
+            if now - state['last_seen'] <= self.timeout and len(self.states) <= self.max_tracks:
+                break
+            del self.states[track_id]
+    
+    def __len__(self):
+        return len(self.states)
\ No newline at end of file
@@ -0,0 +1,190 @@
+#face_tracker.py
+import itertools
+import time
+import cv2
+import numpy as np
+from config import Config
+
+def box_iou(a, b):
+    """IoU of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+class FaceTracker:
+    """Detect-then-track: Haar every redetect_interval frames, sparse optical flow in between"""
+    
+    # Each track keeps a few corner points inside its box. Between detections the points
+    # are followed with pyramidal Lucas-Kanade (checked forwards and backwards) and the box
+    # moves and scales with their median motion. A track whose points are lost forces a
+    # detection on the next frame. Detections are matched to tracks by IoU, so a face
+    # keeps its track id for as long as it stays in view. A face that was missed is kept
+    # aside for timeout seconds and gets its old id back if it is detected again there.
+    def __init__(self, redetect_interval=None, iou_threshold=0.3, min_points=4, max_points=20,
+                 timeout=None):
+        if redetect_interval is None:
+            redetect_interval = Config.FACE_REDETECT_INTERVAL if Config.FACE_TRACKING_ENABLED else 1
+        self.redetect_interval = max(1, redetect_interval)
+        self.iou_threshold = iou_threshold
+        self.min_points = min_points
+        self.max_points = max_points
+        self.timeout = Config.FACE_TRACK_TIMEOUT if timeout is None else timeout
+        
+        self.tracks = []  # dicts: id, bbox, points, age (frames), detected (Haar box this frame), last_seen
+        self.frames_since_detect = None
+        self.detections_run = 0
+        self.missing = {}  # track_id -> track no longer in view, kept until its timeout
+        self._ids = itertools.count(1)
+        self._prev_gray = None
+        self._lost = False
+    
+    def update(self, frame, detect, gray=None, now=None):
+        """Tracks for frame; detect(frame) -> (x, y, w, h) boxes runs only when due"""
+        now = time.time() if now is None else now
+        for track_id, track in list(self.missing.items()):
+            if now - track['last_seen'] > self.timeout:
+                del self.missing[track_id]
+        
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        
+        due = (
+            self._lost or self._prev_gray is None or self._prev_gray.shape != gray.shape
+            or self.frames_since_detect + 1 >= self.redetect_interval
+        )
+        previous = self.tracks
+        if due:
+            self._associate(gray, detect(frame))
+            self.frames_since_detect = 0
+            self.detections_run += 1
+        else:
+            self._follow(gray)
+            self.frames_since_detect += 1
+        
+        current = {track['id'] for track in self.tracks}
+        for track in previous:
+            if track['id'] not in current:
+                self.missing[track['id']] = track
+        for track in self.tracks:
+            track['last_seen'] = now
+            self.missing.pop(track['id'], None)
+        
+        self._prev_gray = gray
+        return self.tracks
+    
+    def reset(self):
+        self.tracks = []
+        self.missing = {}
+        self._prev_gray = None
+        self._lost = False
+    
+    def _seed_points(self, gray, bbox):
+        """Corners inside the central part of the box, in frame coordinates"""
+        x, y, w, h = bbox
+        # Stay off the box border, it is mostly background
+        x1, y1 = x + w // 6, y + h // 6
+        x2, y2 = x + w - w // 6, y + h - h // 6
+        roi = gray[max(0, y1):max(0, y2), max(0, x1):max(0, x2)]
+        if roi.size == 0:
+            return np.empty((0, 1, 2), np.float32)
+        corners = cv2.goodFeaturesToTrack(
+            roi, maxCorners=self.max_points, qualityLevel=0.01, minDistance=3
+        )
+        if corners is None:
+            return np.empty((0, 1, 2), np.float32)
+        return corners + np.array([max(0, x1), max(0, y1)], np.float32)
+    
+    def _associate(self, gray, faces):
+        """Match fresh detections to current and missing tracks by IoU; unmatched faces start a track"""
+        boxes = [tuple(int(v) for v in face) for face in faces]
+        candidates = self.tracks + list(self.missing.values())
+        pairs = sorted(
+            (
+                (box_iou(track['bbox'], box), t, d)
+                for t, track in enumerate(candidates) for d, box in enumerate(boxes)
+            ),
+            reverse=True
+        )
+        matched = {}
+        used = set()
+        for overlap, t, d in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if d in matched or t in used:
+                continue
+            matched[d] = candidates[t]
+            used.add(t)
+        
+        # Keep detection order so output matches plain detection
+        tracks = []
+        for d, box in enumerate(boxes):
+            track = matched.get(d)
+            if track is None:
+                track = {'id': next(self._ids), 'age': 0}
+            track['bbox'] = box
+            track['points'] = self._seed_points(gray, box)
+            track['age'] += 1
+            track['detected'] = True
+            tracks.append(track)
+        self.tracks = tracks
+        self._lost = False
+    
+    def _follow(self, gray):
+        """Move every track with the optical flow of its points"""
+        live = [t for t in self.tracks if len(t['points'])]
+        if len(live) < len(self.tracks):
+            self._lost = True
+        self.tracks = live
+        if not live:
+            return
+        
+        old = np.concatenate([t['points'] for t in live])
+        new, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, gray, old, None, winSize=(15, 15), maxLevel=2
+        )
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._prev_gray, new, None, winSize=(15, 15), maxLevel=2
+        )
+        fb_error = np.linalg.norm((back - old).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < 1.0)
+        
+        h, w = gray.shape[:2]
+        tracks = []
+        start = 0
+        for track in live:
+            n = len(track['points'])
+            keep = good[start:start + n]
+            p0 = old[start:start + n][keep].reshape(-1, 2)
+            p1 = new[start:start + n][keep].reshape(-1, 2)
+            start += n
+            if len(p0) < self.min_points:
+                self._lost = True
+                continue
+            
+            # Translation from the median shift, scale from the median spread ratio
+            shift = np.median(p1 - p0, axis=0)
+            d0 = np.linalg.norm(p0 - p0.mean(axis=0), axis=1)
+            d1 = np.linalg.norm(p1 - p1.mean(axis=0), axis=1)
+            valid = d0 > 1e-3
+            scale = float(np.median(d1[valid] / d0[valid])) if valid.any() else 1.0
+            
+            x, y, bw, bh = track['bbox']
+            cx, cy = x + bw / 2 + shift[0], y + bh / 2 + shift[1]
+            bw, bh = bw * scale, bh * scale
+            x1, y1 = int(round(max(0, cx - bw / 2))), int(round(max(0, cy - bh / 2)))
+            x2, y2 = int(round(min(w, cx + bw / 2))), int(round(min(h, cy + bh / 2)))
+            # Mostly out of view
+            if (x2 - x1) < bw / 2 or (y2 - y1) < bh / 2:
+                self._lost = True
+                continue
+            
+            track['bbox'] = (x1, y1, x2 - x1, y2 - y1)
+            track['points'] = p1.reshape(-1, 1, 2).astype(np.float32)
+            track['age'] += 1
+            track['detected'] = False
+            tracks.append(track)
+        self.tracks = tracks
\ No newline at end of file
@@ -0,0 +1,68 @@
+#frame_context.py
+import threading
+import cv2
+
+class FrameContext:
+    """One camera frame plus its color conversions and downscaled copies, each computed at most once"""
+    
+    # Detectors take either a raw BGR frame or a FrameContext; FrameContext.of() turns
+    # both into a context, so callers outside the ensemble keep passing plain frames.
+    # Variants are read-only views shared by every detector, never modify them in place.
+    CONVERSIONS = {
+        'gray': cv2.COLOR_BGR2GRAY,
+        'hsv': cv2.COLOR_BGR2HSV,
+        'rgb': cv2.COLOR_BGR2RGB,
+        'lab': cv2.COLOR_BGR2LAB
+    }
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self.shape = frame.shape
+        self._cache = {}
+        self._lock = threading.RLock()  # stages may ask for the same variant from two threads
+    
+    @classmethod
+    def of(cls, frame):
+        return frame if isinstance(frame, cls) else cls(frame)
+    
+    def _get(self, key, compute):
+        value = self._cache.get(key)
+        if value is None:
+            with self._lock:
+                value = self._cache.get(key)
+                if value is None:
+                    value = compute()
+                    self._cache[key] = value
+        return value
+    
+    def convert(self, name):
+        """Frame in another color space: gray, hsv, rgb or lab"""
+        return self._get(name, lambda: cv2.cvtColor(self.frame, self.CONVERSIONS[name]))
+    
+    @property
+    def gray(self):
+        return self.convert('gray')
+    
+    @property
+    def hsv(self):
+        return self.convert('hsv')
+    
+    @property
+    def rgb(self):
+        return self.convert('rgb')
+    
+    @property
+    def lab(self):
+        return self.convert('lab')
+    
+    def downscaled(self, width, variant=None):
+        """Frame (or a color variant) resized to width, aspect kept; no upscaling"""
+        def compute():
+            source = self.frame if variant is None else self.convert(variant)
+            h, w = source.shape[:2]
+            if w <= width:
+                return source
+            return cv2.resize(
+                source, (width, max(1, int(round(h * width / w)))), interpolation=cv2.INTER_AREA
+            )
+        return self._get(('downscaled', width, variant), compute)
\ No newline at end of file
@@ -0,0 +1,79 @@
+#histogram_matcher.py
+import threading
+import cv2
+import numpy as np
+from config import Config
+
+class HistogramMatcher:
+    """Per-user gallery of grayscale face histograms, matched by correlation in one matrix product"""
+    
+    def __init__(self, threshold=None):
+        self.threshold = threshold  # None: Config.FACE_RECOGNITION_THRESHOLD
+        self.known_faces = {}  # user_id -> name -> embeddings
+        self.galleries = {}  # user_id -> (names, normalized histogram matrix), rebuilt after changes
+        self.gallery_lock = threading.Lock()
+    
+    def get_face_embedding(self, face_img):
+        # Simple embedding using histogram
+        face_resized = cv2.resize(face_img, (100, 100))
+        gray = cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY)
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        return hist.flatten()
+    
+    @staticmethod
+    def normalize_histograms(hists):
+        # Mean-centered unit rows: HISTCMP_CORREL between two rows is then their dot product
+        hists = np.atleast_2d(np.asarray(hists, dtype=np.float32))
+        centered = hists - hists.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1, keepdims=True)
+        return centered / np.maximum(norms, 1e-12)
+    
+    def get_gallery(self, user_id):
+        with self.gallery_lock:
+            gallery = self.galleries.get(user_id)
+            if gallery is None:
+                names = []
+                hists = []
+                for name, stored_embeddings in self.known_faces.get(user_id, {}).items():
+                    names.extend([name] * len(stored_embeddings))
+                    hists.extend(stored_embeddings)
+                matrix = self.normalize_histograms(hists) if hists else np.zeros((0, 256), dtype=np.float32)
+                gallery = (names, matrix)
+                self.galleries[user_id] = gallery
+            return gallery
+    
+    def recognize_face(self, face_img, user_id):
+        names, matrix = self.get_gallery(user_id)
+        if not names:
+            return "Unknown", 0.0, True
+        
+        embedding = self.normalize_histograms(self.get_face_embedding(face_img))[0]
+        
+        # Correlation against every stored histogram of every person in one product
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+        best_match = names[best]
+        if best_score <= 0:
+            best_match, best_score = "Unknown", 0.0
+        
+        threshold = Config.FACE_RECOGNITION_THRESHOLD if self.threshold is None else self.threshold
+        is_intruder = best_score < threshold
+        return best_match if not is_intruder else "Intruder", best_score, is_intruder
+    
+    def set_known_faces(self, known_faces):
+        """Replace every user's gallery: user_id -> name -> embeddings"""
+        with self.gallery_lock:
+            self.known_faces = known_faces
+            self.galleries = {}
+    
+    def set_person(self, user_id, name, embeddings):
+        """Replace the stored embeddings of one person"""
+        with self.gallery_lock:
+            self.known_faces.setdefault(user_id, {})[name] = list(embeddings)
+            self.galleries.pop(user_id, None)
+    
+    def remove_person(self, user_id, name):
+        with self.gallery_lock:
+            self.known_faces.get(user_id, {}).pop(name, None)
+            self.galleries.pop(user_id, None)
\ No newline at end of file
@@ -0,0 +1,127 @@
+#inference_broker.py
+import time
+import threading
+from concurrent.futures import Future
+from config import Config
+
+class InferenceBroker:
+    """Collects the latest frame of each camera and runs the shared ObjectDetector on them as one batch"""
+    
+    # Cameras submit frames and get a Future back. The broker thread starts a batch
+    # once every recently active camera has a frame waiting, or once the oldest
+    # waiting frame is max_wait seconds old, so latency stays bounded.
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, detector, max_wait=None, max_batch=None, active_timeout=2.0):
+        self.detector = detector
+        self.max_wait = Config.INFERENCE_BATCH_MAX_WAIT if max_wait is None else max_wait
+        self.max_batch = max_batch or Config.INFERENCE_BATCH_SIZE
+        self.active_timeout = active_timeout  # cameras silent for longer are not waited for
+        
+        self._pending = {}  # camera_id -> {'frame', 'futures', 'time'}
+        self._last_seen = {}  # camera_id -> time of the last submit
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.stats = {'batches': 0, 'frames': 0, 'superseded': 0}
+    
+    @classmethod
+    def shared(cls, detector):
+        """One broker per detector, so every camera's pipeline batches into the same calls"""
+        with cls._shared_lock:
+            broker = cls._shared.get(id(detector))
+            if broker is None:
+                broker = cls(detector)
+                cls._shared[id(detector)] = broker
+            return broker
+    
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='inference-broker', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+    
+    def submit(self, camera_id, frame):
+        """Queue frame for camera_id; a newer frame from the same camera replaces a waiting one"""
+        if not self._running:
+            self.start()
+        
+        future = Future()
+        now = time.time()
+        with self._cond:
+            self._last_seen[camera_id] = now
+            entry = self._pending.get(camera_id)
+            if entry is None:
+                self._pending[camera_id] = {'frame': frame, 'futures': [future], 'time': now}
+            else:
+                # Older waiters get the result of the newer frame
+                entry['frame'] = frame
+                entry['futures'].append(future)
+                self.stats['superseded'] += 1
+            self._cond.notify_all()
+        return future
+    
+    def detect(self, camera_id, frame, timeout=None):
+        """Blocking submit(): detections for frame, in ObjectDetector.detect() format"""
+        return self.submit(camera_id, frame).result(timeout)
+    
+    def submit_all(self, frames):
+        """Submit the latest frame of every camera, e.g. CameraService.frame_buffers"""
+        return {
+            camera_id: self.submit(camera_id, frame)
+            for camera_id, frame in list(frames.items()) if frame is not None
+        }
+    
+    def _expected_cameras(self, now):
+        return sum(1 for seen in self._last_seen.values() if now - seen <= self.active_timeout)
+    
+    def _next_batch(self):
+        """Wait until a batch is ready and take it, None once stopped"""
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return None
+            
+            deadline = min(entry['time'] for entry in self._pending.values()) + self.max_wait
+            while self._running:
+                now = time.time()
+                wanted = min(self._expected_cameras(now), self.max_batch)
+                if len(self._pending) >= wanted or now >= deadline:
+                    break
+                self._cond.wait(deadline - now)
+            
+            # Oldest requests first when more cameras are waiting than fit in a batch
+            camera_ids = sorted(self._pending, key=lambda c: self._pending[c]['time'])[:self.max_batch]
+            return [(camera_id, self._pending.pop(camera_id)) for camera_id in camera_ids]
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            
+            try:
+                results = self.detector.detect_batch([entry['frame'] for _, entry in batch])
+            except Exception as e:
+                for _, entry in batch:
+                    for future in entry['futures']:
+                        future.set_exception(e)
+                continue
+            
+            self.stats['batches'] += 1
+            self.stats['frames'] += len(batch)
+            for (_, entry), detections in zip(batch, results):
+                for future in entry['futures']:
+                    future.set_result(detections)
\ No newline at end of file
@@ -0,0 +1,142 @@
+#model_bundle.py
+import os
+import json
+import pickle
+import shutil
+from datetime import datetime
+import numpy as np
+from .face_ann_index import IVFIndex
+
+BUNDLE_FORMAT = 1
+
+class ModelBundle:
+    """Versioned on-disk face model set, one directory per generation"""
+    
+    # Layout under root:
+    #   CURRENT            name of the active generation directory
+    #   gen-000007/
+    #     manifest.json    format, generation, embedding version, shapes, labels
+    #     embeddings.f32   raw float32 gallery rows, opened with np.memmap
+    #     sq_norms.f32     squared row norms for the gallery search
+    #     classifiers.pkl  SVM, KNN, RF and label encoder
+    #     ann_index.npz    optional IVF index
+    # A generation is written to a temp directory and renamed into place, then
+    # CURRENT is swapped with os.replace, so readers never see a partial bundle.
+    def __init__(self, root, keep=2):
+        self.root = root
+        self.keep = keep
+        self.current_path = os.path.join(root, 'CURRENT')
+    
+    def _generation_dir(self, generation):
+        return os.path.join(self.root, f'gen-{generation:06d}')
+    
+    def current_generation(self):
+        """Generation number CURRENT points to, or None if nothing was saved yet"""
+        try:
+            with open(self.current_path, 'r') as f:
+                return int(f.read().strip().split('-')[1])
+        except (OSError, ValueError, IndexError):
+            return None
+    
+    def _generations(self):
+        if not os.path.isdir(self.root):
+            return []
+        generations = []
+        for name in os.listdir(self.root):
+            if name.startswith('gen-'):
+                try:
+                    generations.append(int(name[4:]))
+                except ValueError:
+                    continue
+        return sorted(generations)
+    
+    def save(self, embeddings, sq_norms, labels, classifiers, index=None, embedding_version=None):
+        """Write a new generation and make it current, returns its number"""
+        os.makedirs(self.root, exist_ok=True)
+        generations = self._generations()
+        generation = (generations[-1] if generations else 0) + 1
+        
+        tmp_dir = os.path.join(self.root, f'.tmp-{generation:06d}-{os.getpid()}')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        embeddings.tofile(os.path.join(tmp_dir, 'embeddings.f32'))
+        np.ascontiguousarray(sq_norms, dtype=np.float32).tofile(os.path.join(tmp_dir, 'sq_norms.f32'))
+        
+        with open(os.path.join(tmp_dir, 'classifiers.pkl'), 'wb') as f:
+            pickle.dump(classifiers, f)
+        
+        if index is not None and index.is_trained:
+            index.save(os.path.join(tmp_dir, 'ann_index.npz'))
+        
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'generation': generation,
+            'created_at': datetime.now().isoformat(),
+            'embedding_version': embedding_version,
+            'rows': int(embeddings.shape[0]),
+            'dim': int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+            'labels': [str(l) for l in labels]
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        
+        os.rename(tmp_dir, self._generation_dir(generation))
+        
+        tmp_current = self.current_path + '.tmp'
+        with open(tmp_current, 'w') as f:
+            f.write(f'gen-{generation:06d}')
+        os.replace(tmp_current, self.current_path)
+        
+        self._prune(generation)
+        return generation
+    
+    def _prune(self, current):
+        """Remove old generations, keeping the newest self.keep"""
+        for generation in self._generations()[:-self.keep]:
+            if generation != current:
+                # A reader may still map an old generation; on Windows that fails and is retried next save
+                shutil.rmtree(self._generation_dir(generation), ignore_errors=True)
+    
+    def load(self, generation=None):
+        """Load a generation (default: current) as a dict, embeddings memory-mapped read-only"""
+        if generation is None:
+            generation = self.current_generation()
+        if generation is None:
+            return None
+        
+        bundle_dir = self._generation_dir(generation)
+        with open(os.path.join(bundle_dir, 'manifest.json'), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported model bundle format {manifest.get('format')}")
+        
+        rows, dim = manifest['rows'], manifest['dim']
+        embeddings = np.zeros((0, dim), dtype=np.float32)
+        sq_norms = np.zeros(0, dtype=np.float32)
+        if rows > 0:
+            embeddings = np.memmap(
+                os.path.join(bundle_dir, 'embeddings.f32'), dtype=np.float32, mode='r', shape=(rows, dim)
+            )
+            sq_norms = np.memmap(
+                os.path.join(bundle_dir, 'sq_norms.f32'), dtype=np.float32, mode='r', shape=(rows,)
+            )
+        
+        with open(os.path.join(bundle_dir, 'classifiers.pkl'), 'rb') as f:
+            classifiers = pickle.load(f)
+        
+        index = None
+        index_path = os.path.join(bundle_dir, 'ann_index.npz')
+        if os.path.exists(index_path):
+            index = IVFIndex.load(index_path)
+        
+        return {
+            'generation': generation,
+            'manifest': manifest,
+            'embeddings': embeddings,
+            'sq_norms': sq_norms,
+            'labels': manifest['labels'],
+            'classifiers': classifiers,
+            'index': index
+        }
\ No newline at end of file
@@ -0,0 +1,58 @@
+#motion_gate.py
+import cv2
+import numpy as np
+from config import Config
+from .frame_context import FrameContext
+
+class MotionGate:
+    """Cheap MOG2 foreground check on a downscaled frame, deciding whether the heavy models run"""
+    
+    def __init__(self, background_model=None, width=None, threshold=None, keepalive=None, hold=None):
+        if background_model is None:
+            background_model = cv2.createBackgroundSubtractorMOG2(
+                history=500, varThreshold=50, detectShadows=True
+            )
+        self.background_model = background_model
+        self.width = width or Config.MOTION_GATE_WIDTH
+        self.threshold = Config.MOTION_GATE_THRESHOLD if threshold is None else threshold
+        self.keepalive = keepalive or Config.MOTION_GATE_KEEPALIVE
+        self.hold = Config.MOTION_GATE_HOLD if hold is None else hold
+        
+        self.motion_ratio = 0.0
+        self.reason = None  # why the last checked frame ran: motion, hold or keepalive
+        self._frame = None  # last measured frame, the subtractor sees each frame once
+        self._idle_frames = None  # frames skipped since the models last ran
+        self._hold_left = 0
+    
+    def measure(self, frame):
+        """Fraction of foreground pixels in frame (a BGR frame or FrameContext)"""
+        context = FrameContext.of(frame)
+        if context.frame is self._frame:
+            return self.motion_ratio
+        
+        small = context.downscaled(self.width)
+        
+        # Shadows are marked 127 by MOG2 and do not count as motion
+        fg_mask = self.background_model.apply(small)
+        self.motion_ratio = np.count_nonzero(fg_mask > 127) / fg_mask.size
+        self._frame = context.frame
+        return self.motion_ratio
+    
+    def check(self, frame):
+        """Whether the heavy models should run on frame"""
+        if self.measure(frame) >= self.threshold:
+            # Keep running a little after motion stops, someone may be standing still
+            self._hold_left = self.hold
+            self.reason = 'motion'
+        elif self._hold_left > 0:
+            self._hold_left -= 1
+            self.reason = 'hold'
+        elif self._idle_frames is None or self._idle_frames + 1 >= self.keepalive:
+            self.reason = 'keepalive'
+        else:
+            self._idle_frames += 1
+            self.reason = None
+            return False
+        
+        self._idle_frames = 0
+        return True
\ No newline at end of file
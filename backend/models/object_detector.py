@@ -0,0 +1,119 @@
+#object_detector.py
+import os
+import threading
+from config import Config
+from .detector_backends import BACKENDS, OnnxYOLO, export_onnx, onnx_model_path
+
+class ObjectDetector:
+    """One YOLO model, run once per frame; person, weapon and other consumers filter its boxes"""
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, model_name=None, backend=None, input_size=None, int8=None):
+        self.model_name = model_name or Config.DETECTOR_MODEL
+        self.backend = backend or Config.DETECTOR_BACKEND
+        self.input_size = input_size or Config.DETECTOR_INPUT_SIZE
+        self.int8 = Config.DETECTOR_INT8 if int8 is None else int8
+        self.model = None
+        self.onnx_model = None  # OnnxYOLO when running on onnxruntime / cv2.dnn
+        
+        if self.backend in BACKENDS:
+            self._load_onnx_model()
+        if self.onnx_model is None:
+            self.backend = 'ultralytics'
+            self._load_model()
+    
+    @classmethod
+    def shared(cls):
+        """Process-wide instance so every consumer uses the same loaded weights"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    def _load_onnx_model(self):
+        """Load the exported ONNX model on the configured CPU backend, exporting it first if missing"""
+        int8 = self.int8
+        if int8 and self.backend != 'onnxruntime':
+            # Dynamically quantized graphs use ops cv2.dnn does not implement
+            print("int8 detector weights need onnxruntime, using fp32")
+            int8 = False
+        
+        # onnxruntime takes a dynamic batch axis, so the inference broker can batch cameras
+        dynamic = self.backend == 'onnxruntime'
+        try:
+            model_path = onnx_model_path(
+                Config.PRETRAINED_MODELS_DIR, self.model_name, self.input_size, int8, dynamic
+            )
+            if not os.path.exists(model_path):
+                model_path = export_onnx(
+                    Config.PRETRAINED_MODELS_DIR, self.model_name, self.input_size, int8, dynamic
+                )
+            backend = BACKENDS[self.backend](model_path, Config.DETECTOR_THREADS)
+            self.onnx_model = OnnxYOLO(
+                backend, self.input_size, Config.DETECTOR_CONFIDENCE, Config.DETECTOR_IOU
+            )
+            print(f"YOLO detector loaded on {self.backend} ({os.path.basename(model_path)})")
+        except Exception as e:
+            print(f"Could not load {self.backend} detector, falling back to ultralytics: {e}")
+            self.onnx_model = None
+    
+    def _load_model(self):
+        """Load YOLO model"""
+        try:
+            from ultralytics import YOLO
+            model_path = os.path.join(Config.PRETRAINED_MODELS_DIR, self.model_name + '.pt')
+            if os.path.exists(model_path):
+                self.model = YOLO(model_path)
+            else:
+                # Download if not exists
+                self.model = YOLO(self.model_name + '.pt')
+                os.makedirs(Config.PRETRAINED_MODELS_DIR, exist_ok=True)
+            print("Shared YOLO detector loaded")
+        except Exception as e:
+            print(f"Could not load YOLO: {e}")
+            self.model = None
+    
+    def detect(self, frame):
+        """All boxes in frame as dicts (class_id, class, confidence, bbox), None if no model is available"""
+        return self.detect_batch([frame])[0]
+    
+    def detect_batch(self, frames):
+        """detect() for several frames, in one forward pass where the backend supports it"""
+        if self.onnx_model is not None:
+            try:
+                return self.onnx_model.detect_batch(frames)
+            except Exception as e:
+                print(f"YOLO detection error: {e}")
+                return [None] * len(frames)
+        
+        if self.model is None:
+            return [None] * len(frames)
+        
+        try:
+            results = self.model(
+                list(frames), imgsz=self.input_size, conf=Config.DETECTOR_CONFIDENCE,
+                iou=Config.DETECTOR_IOU, verbose=False
+            )
+            return [self._parse_result(result) for result in results]
+        except Exception as e:
+            print(f"YOLO detection error: {e}")
+            return [None] * len(frames)
+    
+    def _parse_result(self, result):
+        """Boxes of one ultralytics result as detection dicts"""
+        detections = []
+        boxes = result.boxes
+        for cls, conf, (x1, y1, x2, y2) in zip(
+            boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist()
+        ):
+            cls = int(cls)
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+            detections.append({
+                'class_id': cls,
+                'class': result.names[cls].lower(),
+                'confidence': float(conf),
+                'bbox': (x1, y1, x2 - x1, y2 - y1)
+            })
+        return detections
\ No newline at end of file
@@ -1,67 +1,45 @@
 #personDetector.py
 import cv2
 import numpy as np
-import os
-from config import Config
+from .object_detector import ObjectDetector
+from .frame_context import FrameContext
 
 class PersonDetector:
-    def __init__(self):
-        self.model = None
+    def __init__(self, object_detector=None):
+        self.object_detector = object_detector or ObjectDetector.shared()
         self.confidence_threshold = 0.5
-        self._load_model()
     
-    def _load_model(self):
-        """Load YOLO model for person detection"""
-        try:
-            from ultralytics import YOLO
-            model_path = os.path.join(Config.PRETRAINED_MODELS_DIR, 'yolov8n.pt')
-            if os.path.exists(model_path):
-                self.model = YOLO(model_path)
-            else:
-                # Download if not exists
-                self.model = YOLO('yolov8n.pt')
-                # Save for later
-                os.makedirs(Config.PRETRAINED_MODELS_DIR, exist_ok=True)
-            print("YOLO person detector loaded")
-        except Exception as e:
-            print(f"Could not load YOLO: {e}")
-            self.model = None
+    @property
+    def model(self):
+        return self.object_detector.model
     
-    def detect(self, frame):
-        """Detect persons in frame"""
-        if self.model is None:
-            return self._detect_with_hog(frame)
-        
-        try:
-            results = self.model(frame, verbose=False)
-            persons = []
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    
-                    # Class 0 is person in COCO
-                    if cls == 0 and conf > self.confidence_threshold:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        persons.append({
-                            'bbox': (x1, y1, x2 - x1, y2 - y1),
-                            'confidence': conf,
-                            'class': 'person'
-                        })
-            
-            return persons
-        except Exception as e:
-            print(f"YOLO detection error: {e}")
+    def detect(self, frame, detections=None):
+        """Detect persons in frame; detections: this frame's ObjectDetector output, if already computed"""
+        if detections is None:
+            detections = self.object_detector.detect(FrameContext.of(frame).frame)
+        if detections is None:
             return self._detect_with_hog(frame)
+        return self.from_detections(detections)
+    
+    def from_detections(self, detections):
+        """Persons among shared YOLO detections"""
+        persons = []
+        for detection in detections:
+            # Class 0 is person in COCO
+            if detection['class_id'] == 0 and detection['confidence'] > self.confidence_threshold:
+                persons.append({
+                    'bbox': detection['bbox'],
+                    'confidence': detection['confidence'],
+                    'class': 'person'
+                })
+        return persons
     
     def _detect_with_hog(self, frame):
         """Fallback HOG person detector"""
         hog = cv2.HOGDescriptor()
         hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
         
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.of(frame).gray
         boxes, weights = hog.detectMultiScale(
             gray, winStride=(8, 8), padding=(4, 4), scale=1.05
         )
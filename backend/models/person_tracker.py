@@ -0,0 +1,149 @@
+#person_tracker.py
+import itertools
+import time
+from collections import deque
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from config import Config
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) x1, y1, x2, y2 boxes"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    a = a[:, None, :]
+    b = b[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+def xywh_to_xyxy(box):
+    x, y, w, h = box
+    return np.array([x, y, x + w, y + h], dtype=float)
+
+class KalmanBoxTracker:
+    """Constant-velocity Kalman filter over (cx, cy, area, aspect) of one box, as in SORT"""
+    
+    # State: cx, cy, s (area), r (aspect ratio), vx, vy, vs; r is assumed constant
+    F = np.eye(7)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1
+    H = np.eye(4, 7)
+    R = np.diag([1.0, 1.0, 10.0, 10.0])
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+    
+    def __init__(self, box):
+        self.x = np.zeros(7)
+        self.x[:4] = self._to_z(box)
+        # Unknown initial velocities get a large uncertainty
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+    
+    @staticmethod
+    def _to_z(box):
+        x1, y1, x2, y2 = box
+        w, h = x2 - x1, y2 - y1
+        return np.array([x1 + w / 2, y1 + h / 2, w * h, w / max(h, 1e-9)])
+    
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.box()
+    
+    def update(self, box):
+        y = self._to_z(box) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+    
+    def box(self):
+        """Current estimate as x1, y1, x2, y2"""
+        cx, cy, s, r = self.x[:4]
+        w = np.sqrt(max(s * r, 0))
+        h = s / w if w > 0 else 0
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+class PersonTracker:
+    """SORT: Kalman prediction plus Hungarian assignment on IoU, giving persons stable ids"""
+    
+    # Tracks not matched for max_age seconds end. Each track keeps a short history of
+    # (time, bbox) samples; velocity (pixels per second) is measured over the last
+    # velocity_window seconds of it and dwell time runs from the first sighting.
+    def __init__(self, max_age=None, iou_threshold=None, velocity_window=1.0, history=64):
+        self.max_age = Config.PERSON_TRACK_MAX_AGE if max_age is None else max_age
+        self.iou_threshold = Config.PERSON_TRACK_IOU if iou_threshold is None else iou_threshold
+        self.velocity_window = velocity_window
+        self.history = history
+        self.tracks = []
+        self._ids = itertools.count(1)
+    
+    def update(self, boxes, now=None):
+        """Assign each (x, y, w, h) box a track; returns one track dict per box, in order"""
+        now = time.time() if now is None else now
+        detections = np.array([xywh_to_xyxy(b) for b in boxes]).reshape(-1, 4)
+        
+        predicted = np.array([t['kalman'].predict() for t in self.tracks]).reshape(-1, 4)
+        overlaps = iou_matrix(predicted, detections)
+        
+        matches = {}
+        if overlaps.size:
+            rows, cols = linear_sum_assignment(-overlaps)
+            for t, d in zip(rows, cols):
+                if overlaps[t, d] >= self.iou_threshold:
+                    matches[d] = self.tracks[t]
+        
+        assigned = []
+        for d, box in enumerate(boxes):
+            track = matches.get(d)
+            if track is None:
+                track = {
+                    'id': next(self._ids),
+                    'kalman': KalmanBoxTracker(detections[d]),
+                    'first_seen': now,
+                    'history': deque(maxlen=self.history),
+                    'hits': 0
+                }
+                self.tracks.append(track)
+            else:
+                track['kalman'].update(detections[d])
+            track['bbox'] = tuple(int(v) for v in box)
+            track['last_seen'] = now
+            track['hits'] += 1
+            track['history'].append((now, track['bbox']))
+            assigned.append(track)
+        
+        self.tracks = [t for t in self.tracks if now - t['last_seen'] <= self.max_age]
+        return assigned
+    
+    def previous(self, track, now=None):
+        """(time, bbox) sample about velocity_window seconds before the latest one, or None"""
+        history = track['history']
+        if len(history) < 2:
+            return None
+        now = history[-1][0] if now is None else now
+        for sample in history:
+            if now - sample[0] <= self.velocity_window:
+                return sample if sample is not history[-1] else history[-2]
+        return history[-2]
+    
+    def velocity(self, track):
+        """(vx, vy) of the box center in pixels per second"""
+        sample = self.previous(track)
+        if sample is None:
+            return (0.0, 0.0)
+        t0, (x0, y0, w0, h0) = sample
+        t1, (x1, y1, w1, h1) = track['history'][-1]
+        dt = t1 - t0
+        if dt <= 0:
+            return (0.0, 0.0)
+        return (
+            ((x1 + w1 / 2) - (x0 + w0 / 2)) / dt,
+            ((y1 + h1 / 2) - (y0 + h0 / 2)) / dt
+        )
+    
+    @staticmethod
+    def dwell_time(track):
+        return track['last_seen'] - track['first_seen']
\ No newline at end of file
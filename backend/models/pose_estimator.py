@@ -1,6 +1,7 @@
 #poseEstimator.py
 import cv2
 import numpy as np
+from .frame_context import FrameContext
 
 class PoseEstimator:
     def __init__(self):
@@ -24,16 +25,22 @@ class PoseEstimator:
         except Exception as e:
             print(f"Could not load pose estimator: {e}")
     
+    def close(self):
+        """Release the MediaPipe graph"""
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+    
     def estimate(self, frame):
         """Estimate pose in frame"""
         if self.pose is None:
             return None
         
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(rgb)
+        context = FrameContext.of(frame)
+        results = self.pose.process(context.rgb)
         
         if results.pose_landmarks:
-            return self._analyze_pose(results.pose_landmarks, frame.shape)
+            return self._analyze_pose(results.pose_landmarks, context.shape)
         return None
     
     def _analyze_pose(self, landmarks, frame_shape):
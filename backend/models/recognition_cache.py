@@ -0,0 +1,61 @@
+#recognition_cache.py
+import time
+import cv2
+from config import Config
+
+def face_quality(face_image):
+    """Size times sharpness of a face crop; higher is a better recognition input"""
+    if face_image is None or face_image.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY) if face_image.ndim == 3 else face_image
+    # Laplacian variance of ~100 is a reasonably sharp face, blur drives it toward 0
+    sharpness = min(1.0, float(cv2.Laplacian(gray, cv2.CV_64F).var()) / 100.0)
+    return min(gray.shape[:2]) * sharpness
+
+class RecognitionCache:
+    """Recognition results per face track, reused until the track deserves a fresh look"""
+    
+    # A cached result is reused unless the track is new, its confidence was below
+    # min_confidence, the face quality improved by more than quality_gain, the result is
+    # older than ttl seconds, or the models it came from were replaced.
+    def __init__(self, ttl=None, min_confidence=None, quality_gain=None):
+        self.ttl = Config.RECOGNITION_CACHE_TTL if ttl is None else ttl
+        self.min_confidence = Config.FACE_CONFIDENCE_THRESHOLD if min_confidence is None else min_confidence
+        self.quality_gain = Config.RECOGNITION_CACHE_QUALITY_GAIN if quality_gain is None else quality_gain
+        self.entries = {}  # track_id -> {'result', 'confidence', 'quality', 'models', 'time'}
+        self.stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, track_id, quality, models=None, now=None):
+        """Cached result for track_id, or None when recognition should run again"""
+        entry = self.entries.get(track_id)
+        now = time.time() if now is None else now
+        if (
+            entry is None
+            or entry['models'] is not models
+            or entry['confidence'] < self.min_confidence
+            or quality > entry['quality'] * (1 + self.quality_gain)
+            or now - entry['time'] > self.ttl
+        ):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return entry['result']
+    
+    def put(self, track_id, result, quality, models=None, now=None):
+        """Store a recognition result; result[1] is its confidence"""
+        self.entries[track_id] = {
+            'result': result,
+            'confidence': float(result[1]),
+            'quality': quality,
+            'models': models,  # held by reference, a swapped model set never matches again
+            'time': time.time() if now is None else now
+        }
+    
+    def prune(self, track_ids):
+        """Forget tracks that ended"""
+        for track_id in set(self.entries) - set(track_ids):
+            del self.entries[track_id]
+    
+    def hit_rate(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
\ No newline at end of file
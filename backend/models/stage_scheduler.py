@@ -0,0 +1,113 @@
+#stage_scheduler.py
+import time
+
+def parse_stage_settings(value):
+    """Parse 'stage:number,stage:number' config strings into a dict"""
+    settings = {}
+    for item in (value or '').split(','):
+        if ':' not in item:
+            continue
+        name, number = item.split(':', 1)
+        try:
+            settings[name.strip()] = float(number)
+        except ValueError:
+            print(f"Ignoring stage setting {item!r}")
+    return settings
+
+def critical_path(timings, dependencies, sequential=False):
+    """Longest chain of stages that ran this frame, given start/end offsets and dependencies
+
+    In sequential mode every stage waits for the one before it, so the path is all of them.
+    """
+    names = list(timings)
+    if sequential:
+        return names, sum(timings[n]['ms'] for n in names)
+    
+    # Longest path over the dependency DAG, stages listed in submission order
+    best = {}
+    previous = {}
+    for name in names:
+        deps = [d for d in dependencies.get(name, []) if d in best]
+        before = max(deps, key=lambda d: best[d], default=None)
+        best[name] = timings[name]['ms'] + (best[before] if before else 0)
+        previous[name] = before
+    
+    if not best:
+        return [], 0.0
+    end = max(best, key=best.get)
+    path = []
+    while end is not None:
+        path.append(end)
+        end = previous[end]
+    path.reverse()
+    return path, best[path[-1]]
+
+class StageScheduler:
+    """Decides which ensemble stages run on a frame and keeps each stage's latest output"""
+    
+    # Per stage:
+    #   cadence  target runs per second, 0 = every frame
+    #   budget   share of wall-clock time the stage may use (0.2 = 200 ms per second),
+    #            a stage slower than that is spaced out further; 0 = unlimited
+    def __init__(self, cadences=None, budgets=None):
+        self.cadences = cadences or {}
+        self.budgets = budgets or {}
+        self.frame_index = 0
+        self.stages = {}
+    
+    def _stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = {
+                'output': None,
+                'last_run': None,  # time of the last run
+                'last_frame': None,  # frame index of the last run
+                'cost': None  # smoothed run time in seconds
+            }
+        return self.stages[name]
+    
+    def next_frame(self):
+        self.frame_index += 1
+        return self.frame_index
+    
+    def interval(self, name):
+        """Minimum seconds between two runs of a stage"""
+        stage = self._stage(name)
+        cadence = self.cadences.get(name, 0)
+        interval = 1.0 / cadence if cadence > 0 else 0.0
+        
+        budget = self.budgets.get(name, 0)
+        if budget > 0 and stage['cost'] is not None:
+            interval = max(interval, stage['cost'] / budget)
+        return interval
+    
+    def is_due(self, name, now=None):
+        stage = self._stage(name)
+        if stage['last_run'] is None:
+            return True
+        now = time.time() if now is None else now
+        return now - stage['last_run'] >= self.interval(name)
+    
+    def record(self, name, output, elapsed, now=None):
+        """Store a fresh stage output and how long it took"""
+        stage = self._stage(name)
+        stage['output'] = output
+        stage['last_run'] = time.time() if now is None else now
+        stage['last_frame'] = self.frame_index
+        stage['cost'] = elapsed if stage['cost'] is None else 0.8 * stage['cost'] + 0.2 * elapsed
+    
+    def output(self, name):
+        return self._stage(name)['output']
+    
+    def staleness(self, now=None):
+        """Age in seconds and frames of every stage's output"""
+        now = time.time() if now is None else now
+        report = {}
+        for name, stage in self.stages.items():
+            if stage['last_run'] is None:
+                continue
+            report[name] = {
+                'age': now - stage['last_run'],
+                'frames': self.frame_index - stage['last_frame'],
+                'cost_ms': stage['cost'] * 1000
+            }
+        return report
\ No newline at end of file
@@ -1,62 +1,42 @@
 #weaponDetector.py
-import cv2
-import numpy as np
-import os
-from config import Config
+from .object_detector import ObjectDetector
 
 class WeaponDetector:
-    def __init__(self):
-        self.model = None
+    def __init__(self, object_detector=None):
+        self.object_detector = object_detector or ObjectDetector.shared()
         self.confidence_threshold = 0.4
         self.weapon_classes = ['knife', 'gun', 'pistol', 'rifle', 'weapon']
-        self._load_model()
     
-    def _load_model(self):
-        """Load weapon detection model"""
-        try:
-            from ultralytics import YOLO
-            model_path = os.path.join(Config.PRETRAINED_MODELS_DIR, 'yolov8n.pt')
-            if os.path.exists(model_path):
-                self.model = YOLO(model_path)
-            else:
-                self.model = YOLO('yolov8n.pt')
-            print("Weapon detector loaded (using general YOLO)")
-        except Exception as e:
-            print(f"Could not load weapon detector: {e}")
-            self.model = None
+    @property
+    def model(self):
+        return self.object_detector.model
     
-    def detect(self, frame):
-        """Detect weapons in frame"""
-        if self.model is None:
+    def detect(self, frame, detections=None):
+        """Detect weapons in frame; detections: this frame's ObjectDetector output, if already computed"""
+        if detections is None:
+            detections = self.object_detector.detect(frame)
+        if detections is None:
             return []
-        
-        try:
-            results = self.model(frame, verbose=False)
-            weapons = []
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    class_name = result.names[cls].lower()
-                    
-                    # Check for weapon-like objects
-                    # COCO classes: knife(43), scissors(76)
-                    if cls in [43, 76] or any(w in class_name for w in self.weapon_classes):
-                        if conf > self.confidence_threshold:
-                            x1, y1, x2, y2 = map(int, box.xyxy[0])
-                            weapons.append({
-                                'bbox': (x1, y1, x2 - x1, y2 - y1),
-                                'confidence': conf,
-                                'class': class_name,
-                                'is_weapon': True
-                            })
+        return self.from_detections(detections)
+    
+    def from_detections(self, detections):
+        """Weapon-like objects among shared YOLO detections"""
+        weapons = []
+        for detection in detections:
+            cls = detection['class_id']
+            class_name = detection['class']
             
-            return weapons
-        except Exception as e:
-            print(f"Weapon detection error: {e}")
-            return []
+            # Check for weapon-like objects
+            # COCO classes: knife(43), scissors(76)
+            if cls in [43, 76] or any(w in class_name for w in self.weapon_classes):
+                if detection['confidence'] > self.confidence_threshold:
+                    weapons.append({
+                        'bbox': detection['bbox'],
+                        'confidence': detection['confidence'],
+                        'class': class_name,
+                        'is_weapon': True
+                    })
+        return weapons
     
     def has_weapon(self, frame):
         """Check if frame contains any weapon"""
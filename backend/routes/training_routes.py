@@ -26,6 +26,9 @@ def start_training():
     def train_callback(status):
         training_status['progress'] = status.get('progress', 0)
         training_status['message'] = status.get('status', '')
+        if 'processed' in status:
+            training_status['processed'] = status['processed']
+            training_status['total_images'] = status['total_images']
     
     def train_thread():
         training_status['is_training'] = True
@@ -45,6 +48,10 @@ def start_training():
 def get_training_status():
     return jsonify(training_status)
 
+@training_bp.route('/models', methods=['GET'])
+def get_model_status():
+    return jsonify(training_service.get_model_status())
+
 @training_bp.route('/collect/<camera_id>', methods=['POST'])
 def collect_images(camera_id):
     data = request.json
@@ -3,6 +3,7 @@ import cv2
 import numpy as np
 from datetime import datetime
 from config import Config
+from models.frame_context import FrameContext
 
 class NightVisionService:
     def __init__(self):
@@ -12,7 +13,7 @@ class NightVisionService:
     
     def is_low_light(self, frame):
         """Check if frame is in low light conditions"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.of(frame).gray
         brightness = np.mean(gray)
         return brightness < self.brightness_threshold
     
@@ -42,7 +43,7 @@ class NightVisionService:
     
     def _clahe_enhance(self, frame):
         """CLAHE enhancement"""
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        lab = FrameContext.of(frame).lab
         l, a, b = cv2.split(lab)
         
         clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
@@ -2,6 +2,7 @@
 import cv2
 import numpy as np
 from collections import deque
+from models.frame_context import FrameContext
 
 class SceneDetector:
     def __init__(self, history_size=100):
@@ -16,7 +17,7 @@ class SceneDetector:
     
     def _compute_histogram(self, frame):
         """Compute color histogram of frame"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv = FrameContext.of(frame).hsv
         hist = cv2.calcHist([hsv], [0, 1, 2], None, [8, 8, 8], [0, 180, 0, 256, 0, 256])
         hist = cv2.normalize(hist, hist).flatten()
         return hist
@@ -45,7 +46,7 @@ class SceneDetector:
         issues = []
         
         # Check for camera tilt (horizontal line detection)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = FrameContext.of(frame).gray
         edges = cv2.Canny(gray, 50, 150)
         lines = cv2.HoughLines(edges, 1, np.pi/180, 100)
         
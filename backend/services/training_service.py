@@ -9,7 +9,8 @@ from models.face_recognition import FaceRecognizer
 
 class TrainingService:
     def __init__(self):
-        self.face_recognizer = FaceRecognizer()
+        # The recognizer live detection uses, so its model status is the one being served
+        self.face_recognizer = FaceRecognizer.shared()
         self.is_training = False
         self.training_progress = 0
         self.haar_cascade = cv2.CascadeClassifier(
@@ -102,12 +103,28 @@ class TrainingService:
             # Split data
             self._split_train_test()
             
+            self.training_progress = 20
             if callback:
                 callback({'status': 'splitting', 'progress': 20})
             
+            # Embedding reports each finished image (20-90%), then model fitting
+            def on_progress(status):
+                if status['status'] == 'embedding' and status['total']:
+                    self.training_progress = 20 + 70 * status['processed'] / status['total']
+                elif status['status'] == 'fitting':
+                    self.training_progress = 90
+                if callback:
+                    callback({
+                        'status': status['status'],
+                        'progress': self.training_progress,
+                        'processed': status['processed'],
+                        'total_images': status['total']
+                    })
+            
             # Train models
-            success, results = self.face_recognizer.train()
+            success, results = self.face_recognizer.train(callback=on_progress)
             
+            self.training_progress = 100
             if callback:
                 callback({'status': 'complete', 'progress': 100, 'results': results})
             
@@ -153,6 +170,10 @@ class TrainingService:
             'progress': self.training_progress
         }
     
+    def get_model_status(self):
+        """Get the face model generation live recognition uses and the latest one saved"""
+        return self.face_recognizer.get_model_status()
+    
     def get_people_list(self):
         """Get list of trained people"""
         people = []
@@ -172,5 +193,6 @@ class TrainingService:
         person_dir = os.path.join(Config.TRAIN_DIR, person_name)
         if os.path.exists(person_dir):
             shutil.rmtree(person_dir)
+            self.face_recognizer.remove_person(person_name)
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,65 @@
+#test_anomaly_detector.py
+import cv2
+import numpy as np
+from models.anomaly_detector import AnomalyDetector
+
+class FrameHistoryReference:
+    """The frame-list scene/frozen checks the histogram ring replaced"""
+    
+    def __init__(self, max_history=30):
+        self.prev_frame = None
+        self.frame_history = []
+        self.max_history = max_history
+    
+    def is_frame_frozen(self, frame):
+        if self.prev_frame is None:
+            self.prev_frame = frame.copy()
+            return False
+        diff_sum = np.sum(cv2.absdiff(frame, self.prev_frame))
+        self.prev_frame = frame.copy()
+        return diff_sum < 1000
+    
+    def scene_changed(self, frame):
+        self.frame_history.append(frame.copy())
+        if len(self.frame_history) > self.max_history:
+            self.frame_history.pop(0)
+        if len(self.frame_history) < 2:
+            return False
+        current_hist = cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+        current_hist = cv2.normalize(current_hist, current_hist).flatten()
+        old_frame = self.frame_history[0]
+        old_hist = cv2.calcHist([old_frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+        old_hist = cv2.normalize(old_hist, old_hist).flatten()
+        return cv2.compareHist(current_hist, old_hist, cv2.HISTCMP_CORREL) < 0.5
+
+def frames(rng, shape=(120, 160, 3)):
+    """Noisy scene, frozen stretch, covered lens, then a different scene"""
+    scene = rng.integers(0, 256, shape, dtype=np.uint8)
+    other = (rng.random(shape) * 80).astype(np.uint8)
+    for i in range(100):
+        if i < 30:
+            noise = rng.integers(-8, 8, shape)
+            yield np.clip(scene.astype(int) + noise, 0, 255).astype(np.uint8)
+        elif i < 45:
+            yield scene
+        elif i < 55:
+            yield np.full(shape, 40, dtype=np.uint8)
+        else:
+            noise = rng.integers(-8, 8, shape)
+            yield np.clip(other.astype(int) + noise, 0, 255).astype(np.uint8)
+
+def test_histogram_ring_matches_the_frame_history():
+    detector = AnomalyDetector()
+    reference = FrameHistoryReference(detector.max_history)
+    
+    outcomes = []
+    for frame in frames(np.random.default_rng(0)):
+        expected = (reference.is_frame_frozen(frame), reference.scene_changed(frame))
+        actual = (detector._is_frame_frozen(frame), detector._detect_scene_change(frame)['changed'])
+        assert actual == expected
+        outcomes.append(actual)
+    
+    # The sequence exercises both checks, including comparisons after the ring wrapped
+    assert any(frozen for frozen, _ in outcomes)
+    assert any(changed for _, changed in outcomes[detector.max_history:])
+    assert detector.hist_count == detector.max_history
\ No newline at end of file
@@ -0,0 +1,109 @@
+#test_camera_state.py
+import threading
+import time
+from models.camera_state import CameraStates
+
+class Recorder:
+    """Factory and on_evict callback that remember what they built and closed"""
+    
+    def __init__(self):
+        self.built = []
+        self.closed = []
+    
+    def factory(self, camera_id):
+        state = {'camera_id': camera_id}
+        self.built.append(state)
+        return state
+    
+    def on_evict(self, state):
+        self.closed.append(state)
+
+def test_acquire_reuses_the_resident_state():
+    recorder = Recorder()
+    states = CameraStates(recorder.factory, max_cameras=4, idle_timeout=0, on_evict=recorder.on_evict)
+    first = states.acquire('cam1', now=0)
+    states.release(first)
+    assert states.acquire('cam1', now=1) is first
+    assert len(recorder.built) == 1 and states.stats['created'] == 1
+
+def test_least_recently_used_camera_is_evicted_and_closed():
+    recorder = Recorder()
+    states = CameraStates(recorder.factory, max_cameras=2, idle_timeout=0, on_evict=recorder.on_evict)
+    for now, camera_id in enumerate(['cam1', 'cam2', 'cam1', 'cam3']):
+        states.release(states.acquire(camera_id, now=now))
+    
+    assert 'cam2' not in states and 'cam1' in states and 'cam3' in states
+    assert [s['camera_id'] for s in recorder.closed] == ['cam2']
+    assert states.stats['evicted'] == 1
+
+def test_state_evicted_while_in_use_is_closed_on_its_last_release():
+    recorder = Recorder()
+    states = CameraStates(recorder.factory, max_cameras=1, idle_timeout=0, on_evict=recorder.on_evict)
+    busy = states.acquire('cam1', now=0)
+    again = states.acquire('cam1', now=0)
+    states.release(states.acquire('cam2', now=1))
+    
+    # cam1 left the resident set but two frames still hold it
+    assert 'cam1' not in states and recorder.closed == []
+    states.release(busy)
+    assert recorder.closed == []
+    states.release(again)
+    assert recorder.closed == [busy]
+    assert id(busy) not in states.users
+    assert id(busy) not in states.retired
+
+def test_idle_cameras_are_retired():
+    recorder = Recorder()
+    states = CameraStates(recorder.factory, max_cameras=4, idle_timeout=10, on_evict=recorder.on_evict)
+    states.release(states.acquire('cam1', now=0))
+    states.release(states.acquire('cam2', now=5))
+    states.evict_idle(now=12)
+    assert 'cam1' not in states and 'cam2' in states
+    
+    states.remove('cam2')
+    assert len(states) == 0
+    assert [s['camera_id'] for s in recorder.closed] == ['cam1', 'cam2']
+
+def test_racing_first_acquires_close_the_duplicate():
+    recorder = Recorder()
+    start = threading.Barrier(2)
+    def factory(camera_id):
+        start.wait(5)  # both threads are building before either stores its state
+        return recorder.factory(camera_id)
+    states = CameraStates(factory, max_cameras=4, idle_timeout=0, on_evict=recorder.on_evict)
+    
+    acquired = []
+    threads = [
+        threading.Thread(target=lambda: acquired.append(states.acquire('cam1', now=0)))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(recorder.built) == 2
+    assert acquired[0] is acquired[1]
+    duplicate = next(s for s in recorder.built if s is not acquired[0])
+    assert recorder.closed == [duplicate]
+    assert states.stats['created'] == 1
+
+def test_slow_factory_does_not_block_other_cameras():
+    release = threading.Event()
+    def factory(camera_id):
+        if camera_id == 'slow':
+            release.wait(5)
+        return {'camera_id': camera_id}
+    states = CameraStates(factory, max_cameras=4, idle_timeout=0)
+    
+    slow = threading.Thread(target=states.acquire, args=('slow',))
+    slow.start()
+    time.sleep(0.05)
+    
+    started = time.time()
+    fast = states.acquire('fast')
+    assert time.time() - started < 1
+    assert fast['camera_id'] == 'fast'
+    release.set()
+    slow.join()
+    assert 'slow' in states
\ No newline at end of file
@@ -0,0 +1,60 @@
+#test_face_ann_index.py
+import numpy as np
+from models.face_ann_index import IVFIndex
+
+def clustered(rng, n_clusters, per_cluster, dim=32, spread=0.1):
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    noise = spread * rng.standard_normal((n_clusters, per_cluster, dim)).astype(np.float32)
+    return (centers[:, None, :] + noise).reshape(-1, dim)
+
+def exact_nearest(queries, data):
+    sq_dists = ((queries[:, None, :] - data[None, :, :]) ** 2).sum(axis=2)
+    return np.argmin(sq_dists, axis=1)
+
+def test_recall_matches_exact_search_on_clustered_embeddings():
+    rng = np.random.default_rng(0)
+    data = clustered(rng, 40, 50)
+    queries = data[rng.choice(len(data), 200, replace=False)]
+    queries = queries + 0.02 * rng.standard_normal(queries.shape).astype(np.float32)
+    
+    index = IVFIndex(nlist=20, nprobe=4)
+    index.build(data)
+    sq_norms = np.einsum('ij,ij->i', data, data)
+    distances, indices = index.search(queries, data, sq_norms, k=1)
+    
+    recall = np.mean(indices[:, 0] == exact_nearest(queries, data))
+    assert recall >= 0.95
+    assert (indices >= 0).all()
+    expected = np.linalg.norm(queries - data[indices[:, 0]], axis=1)
+    assert np.allclose(distances[:, 0], expected, atol=1e-3)
+
+def test_added_rows_are_found():
+    rng = np.random.default_rng(1)
+    data = clustered(rng, 10, 20)
+    index = IVFIndex(nlist=8, nprobe=8)
+    index.build(data[:150])
+    index.add(data[150:])
+    
+    sq_norms = np.einsum('ij,ij->i', data, data)
+    _, indices = index.search(data[150:], data, sq_norms, k=1)
+    assert indices[:, 0].tolist() == list(range(150, 200))
+
+def test_empty_probe_returns_minus_one():
+    # Two centroids, the second with an empty inverted list
+    data = np.array([[0, 0], [0.1, 0], [0, 0.1]], dtype=np.float32)
+    index = IVFIndex(nprobe=1)
+    index.centroids = np.array([[0, 0], [10, 10]], dtype=np.float32)
+    index._centroid_sq_norms = np.einsum('ij,ij->i', index.centroids, index.centroids)
+    index.lists = [np.arange(3), np.zeros(0, dtype=np.int64)]
+    index.size = 3
+    sq_norms = np.einsum('ij,ij->i', data, data)
+    
+    distances, indices = index.search(np.array([[10, 10]]), data, sq_norms, k=2)
+    assert indices.tolist() == [[-1, -1]]
+    assert np.isinf(distances).all()
+    
+    # Fewer candidates than k pads the tail
+    distances, indices = index.search(np.array([[0, 0]]), data, sq_norms, k=5)
+    assert indices[0, :3].tolist() == [0, 1, 2]
+    assert indices[0, 3:].tolist() == [-1, -1]
+    assert np.isinf(distances[0, 3:]).all()
\ No newline at end of file
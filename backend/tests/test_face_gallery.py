@@ -0,0 +1,61 @@
+#test_face_gallery.py
+import numpy as np
+from models.face_gallery import FaceGallery
+from models.face_ann_index import IVFIndex
+
+def rows(rng, n, dim=16):
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+def test_add_to_a_copy_appends_in_place_and_leaves_the_original_unchanged():
+    rng = np.random.default_rng(0)
+    original = FaceGallery(capacity=64)
+    known = rows(rng, 10)
+    original.add(known, [f'p{i}' for i in range(10)])
+    
+    extended = original.copy()
+    new = rows(rng, 3)
+    extended.add(new, ['x', 'y', 'z'])
+    
+    # The new rows went into the shared buffer, nothing was copied
+    assert extended._data is original._data
+    assert len(original) == 10 and len(extended) == 13
+    assert original.labels == [f'p{i}' for i in range(10)]
+    assert extended.labels[-3:] == ['x', 'y', 'z']
+    
+    _, indices = original.search(new, k=1)
+    assert (indices[:, 0] < 10).all()
+    _, indices = extended.search(new, k=1, exact=True)
+    assert indices[:, 0].tolist() == [10, 11, 12]
+
+def test_adding_to_a_stale_copy_does_not_overwrite_newer_rows():
+    rng = np.random.default_rng(1)
+    base = FaceGallery(capacity=64)
+    base.add(rows(rng, 5), list('abcde'))
+    
+    first = base.copy()
+    first_rows = rows(rng, 2)
+    first.add(first_rows, ['f1', 'f2'])
+    second = base.copy()
+    second.add(rows(rng, 2), ['s1', 's2'])
+    
+    assert second._data is not first._data
+    _, indices = first.search(first_rows, k=1, exact=True)
+    assert [first.labels[i] for i in indices[:, 0]] == ['f1', 'f2']
+    assert second.labels == list('abcde') + ['s1', 's2']
+
+def test_remove_label_on_a_copy_leaves_the_original_searchable():
+    rng = np.random.default_rng(2)
+    original = FaceGallery(index=IVFIndex(nlist=4, nprobe=4))
+    data = rows(rng, 40)
+    original.add(data, [f'p{i % 4}' for i in range(40)])
+    original.build_index()
+    
+    trimmed = original.copy()
+    assert trimmed.remove_label('p1') == 10
+    
+    assert len(original) == 40 and original.uses_index()
+    _, indices = original.search(data, k=1)
+    assert indices[:, 0].tolist() == list(range(40))
+    assert 'p1' not in trimmed.labels and trimmed.uses_index()
+    _, indices = trimmed.search(data[1::4], k=1)
+    assert all(trimmed.labels[i] != 'p1' for i in indices[:, 0])
\ No newline at end of file
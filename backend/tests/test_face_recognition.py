@@ -0,0 +1,159 @@
+#test_face_recognition.py
+# Run from backend/: python -m pytest tests
+import os
+import shutil
+import threading
+import time
+import numpy as np
+import pytest
+from config import Config
+from models.face_recognition import FaceRecognizer
+
+def face(rng, base):
+    noise = rng.integers(-10, 10, base.shape)
+    return np.clip(base.astype(int) + noise, 0, 255).astype(np.uint8)
+
+@pytest.fixture
+def recognizer(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'TRAIN_DIR', str(tmp_path / 'train'))
+    monkeypatch.setattr(Config, 'TRAINED_MODELS_DIR', str(tmp_path / 'trained'))
+    monkeypatch.setattr(Config, 'FACE_ANN_ENABLED', False)
+    recognizer = FaceRecognizer()
+    # Refits run synchronously through train() in the tests
+    monkeypatch.setattr(recognizer, 'schedule_retrain', lambda delay=None: None)
+    return recognizer
+
+def test_removed_person_is_not_recognized(recognizer):
+    rng = np.random.default_rng(0)
+    bases = {name: rng.integers(0, 256, (100, 100, 3), dtype=np.uint8) for name in ('alice', 'bob', 'carol')}
+    for name, base in bases.items():
+        recognizer.add_face(name, [face(rng, base) for _ in range(6)])
+    success, _ = recognizer.train()
+    assert success
+    
+    probe = face(rng, bases['bob'])
+    assert recognizer.recognize(probe)[0] == 'bob'
+    
+    shutil.rmtree(os.path.join(Config.TRAIN_DIR, 'bob'))
+    assert recognizer.remove_person('bob') == 6
+    assert recognizer.recognize(probe)[0] != 'bob'
+    
+    # The saved generation must not bring the person back either
+    reloaded = FaceRecognizer()
+    assert reloaded.recognize(probe)[0] != 'bob'
+    
+    # Nor the refit that follows the removal
+    recognizer.train()
+    assert recognizer.recognize(probe)[0] != 'bob'
+
+def test_refit_does_not_undo_changes_made_during_it(recognizer, monkeypatch):
+    rng = np.random.default_rng(1)
+    bases = {name: rng.integers(0, 256, (100, 100, 3), dtype=np.uint8) for name in ('alice', 'bob', 'dave')}
+    for name in ('alice', 'bob'):
+        recognizer.add_face(name, [face(rng, bases[name]) for _ in range(6)])
+    assert recognizer.train()[0]
+    
+    scheduled = []
+    monkeypatch.setattr(recognizer, 'schedule_retrain', lambda delay=None: scheduled.append(delay))
+    
+    def change_faces(status):
+        # Runs after train() listed the training images, before it swaps
+        if status['status'] == 'fitting' and not scheduled:
+            recognizer.add_face('dave', [face(rng, bases['dave']) for _ in range(6)])
+            shutil.rmtree(os.path.join(Config.TRAIN_DIR, 'bob'))
+            recognizer.remove_person('bob')
+    
+    success, _ = recognizer.train(callback=change_faces)
+    assert not success and scheduled
+    assert 'dave' in recognizer.gallery.labels
+    assert 'bob' not in recognizer.gallery.labels
+    assert recognizer.recognize(face(rng, bases['bob']))[0] != 'bob'
+    
+    # The rescheduled refit sees the current training images
+    assert recognizer.train()[0]
+    assert 'bob' not in recognizer.label_encoder.classes_
+    assert 'dave' in recognizer.label_encoder.classes_
+
+def test_empty_index_probe_is_an_unknown_distance_vote(recognizer, monkeypatch):
+    rng = np.random.default_rng(2)
+    bases = {name: rng.integers(0, 256, (100, 100, 3), dtype=np.uint8) for name in ('alice', 'bob')}
+    for name, base in bases.items():
+        recognizer.add_face(name, [face(rng, base) for _ in range(6)])
+    
+    # What IVFIndex.search returns when every probed list is empty
+    def empty_probe(queries, k=1, exact=False):
+        shape = (len(np.atleast_2d(queries)), k)
+        return np.full(shape, np.inf, dtype=np.float32), np.full(shape, -1, dtype=np.intp)
+    monkeypatch.setattr(recognizer.gallery, 'search', empty_probe)
+    
+    votes = []
+    monkeypatch.setattr(recognizer, '_vote', lambda results: votes.append(results) or ('unknown', 0.0))
+    recognizer.recognize(face(rng, bases['alice']))
+    
+    # Not a vote for the last enrolled row (labels[-1])
+    assert ('distance', 'unknown', 0.0) in votes[0]
+    assert not any(label == 'bob' for _, label, _ in votes[0])
+
+def wait_for_load(recognizer, timeout=10):
+    deadline = time.time() + timeout
+    while recognizer._loading_generation is not None and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_refresh_swaps_in_newer_generations_only(recognizer, monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_MODEL_POLL_INTERVAL', 0)
+    rng = np.random.default_rng(3)
+    for name in ('alice', 'bob'):
+        base = rng.integers(0, 256, (100, 100, 3), dtype=np.uint8)
+        recognizer.add_face(name, [face(rng, base) for _ in range(6)])
+    assert recognizer.train()[0]
+    reader = FaceRecognizer()
+    assert reader.generation == 1
+    
+    # Another instance saves generation 2; the reader loads it off the frame loop
+    assert recognizer.train()[0]
+    assert not reader.refresh_models()
+    wait_for_load(reader)
+    assert reader.refresh_models()
+    assert reader.generation == 2
+    
+    # A slow load of an older generation never replaces a newer pending or active one
+    assert recognizer.train()[0]
+    reader._load_generation(3)
+    reader._load_generation(2)
+    assert reader._pending_models.generation == 3
+    assert reader.refresh_models() and reader.generation == 3
+    reader._load_generation(2)
+    assert not reader.refresh_models()
+    assert reader.generation == 3
+
+def test_concurrent_polls_start_one_load(recognizer, monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_MODEL_POLL_INTERVAL', 0)
+    rng = np.random.default_rng(4)
+    for name in ('alice', 'bob'):
+        base = rng.integers(0, 256, (100, 100, 3), dtype=np.uint8)
+        recognizer.add_face(name, [face(rng, base) for _ in range(6)])
+    reader = FaceRecognizer()
+    assert recognizer.train()[0]
+    
+    loads = []
+    release = threading.Event()
+    def slow_load(generation):
+        loads.append(generation)
+        release.wait(10)
+        with reader._refresh_lock:
+            reader._loading_generation = None
+    monkeypatch.setattr(reader, '_load_generation', slow_load)
+    
+    start = threading.Barrier(8)
+    def poll():
+        start.wait()
+        reader.refresh_models()
+    threads = [threading.Thread(target=poll) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    
+    wait_for_load(reader)
+    assert loads == [1]
\ No newline at end of file
@@ -0,0 +1,39 @@
+#test_face_roi.py
+import numpy as np
+from models.face_roi import ROIFaceDetector
+
+class CountingCascade:
+    """Records the size of every searched image"""
+    def __init__(self):
+        self.searches = []
+    
+    def detectMultiScale(self, gray, **kwargs):
+        self.searches.append(gray.shape)
+        return ()
+
+def test_cameras_sharing_a_detector_keep_their_own_full_frame_schedule():
+    cascade = CountingCascade()
+    detector = ROIFaceDetector(cascade, enabled=True, full_frame_interval=2)
+    states = {'a': detector.new_state(), 'b': detector.new_state()}
+    frame = np.zeros((480, 640), np.uint8)
+    boxes = [(100, 50, 120, 300)]
+    
+    full_frames = {'a': 0, 'b': 0}
+    for _ in range(6):
+        for camera, state in states.items():
+            cascade.searches.clear()
+            detector.detect(frame, boxes, state=state)
+            full_frames[camera] += (480, 640) in cascade.searches
+    
+    # Every other call of each camera searches the full frame
+    assert full_frames == {'a': 3, 'b': 3}
+    # The last call of each camera was a person-box search
+    assert states['a']['last_rois'] and states['b']['last_rois']
+
+def test_without_state_the_full_frame_is_searched():
+    cascade = CountingCascade()
+    detector = ROIFaceDetector(cascade, enabled=True, full_frame_interval=10)
+    frame = np.zeros((480, 640), np.uint8)
+    for _ in range(3):
+        detector.detect(frame, [(100, 50, 120, 300)])
+    assert cascade.searches == [(480, 640)] * 3
\ No newline at end of file
@@ -0,0 +1,67 @@
+#test_model_bundle.py
+import os
+import numpy as np
+import pytest
+from models.model_bundle import ModelBundle
+from models.face_ann_index import IVFIndex
+
+def save(bundle, rng, labels, index=None):
+    embeddings = rng.standard_normal((len(labels), 8)).astype(np.float32)
+    sq_norms = np.einsum('ij,ij->i', embeddings, embeddings)
+    generation = bundle.save(embeddings, sq_norms, labels, {'svm': None}, index, embedding_version=3)
+    return generation, embeddings
+
+def test_save_swaps_current_to_the_new_generation(tmp_path):
+    rng = np.random.default_rng(0)
+    bundle = ModelBundle(str(tmp_path))
+    assert bundle.current_generation() is None and bundle.load() is None
+    
+    first, _ = save(bundle, rng, ['a', 'b'])
+    second, embeddings = save(bundle, rng, ['a', 'b', 'c'])
+    assert (first, second) == (1, 2)
+    assert bundle.current_generation() == 2
+    
+    loaded = bundle.load()
+    assert loaded['generation'] == 2
+    assert loaded['labels'] == ['a', 'b', 'c']
+    assert loaded['manifest']['embedding_version'] == 3
+    assert np.array_equal(loaded['embeddings'], embeddings)
+    assert not loaded['embeddings'].flags.writeable
+    
+    # An older generation is still readable until it is pruned
+    assert bundle.load(1)['labels'] == ['a', 'b']
+
+def test_save_prunes_all_but_the_newest_generations(tmp_path):
+    rng = np.random.default_rng(1)
+    bundle = ModelBundle(str(tmp_path), keep=2)
+    for _ in range(4):
+        save(bundle, rng, ['a'])
+    
+    assert bundle._generations() == [3, 4]
+    assert not os.path.exists(os.path.join(str(tmp_path), 'gen-000001'))
+    with pytest.raises(OSError):
+        bundle.load(1)
+
+def test_unfinished_save_is_not_visible(tmp_path):
+    rng = np.random.default_rng(2)
+    bundle = ModelBundle(str(tmp_path))
+    save(bundle, rng, ['a'])
+    
+    # A writer that died before renaming its temp directory
+    os.makedirs(os.path.join(str(tmp_path), '.tmp-000002-1234'))
+    assert bundle.current_generation() == 1
+    assert bundle.load()['generation'] == 1
+    assert save(bundle, rng, ['a', 'b'])[0] == 2
+
+def test_index_round_trips(tmp_path):
+    rng = np.random.default_rng(3)
+    bundle = ModelBundle(str(tmp_path))
+    data = rng.standard_normal((40, 8)).astype(np.float32)
+    index = IVFIndex(nlist=4, nprobe=2)
+    index.build(data)
+    save(bundle, rng, ['a'] * 40, index)
+    
+    loaded = bundle.load()['index']
+    assert loaded.nprobe == 2 and loaded.size == 40
+    assert np.array_equal(loaded.centroids, index.centroids)
+    assert [l.tolist() for l in loaded.lists] == [l.tolist() for l in index.lists]
\ No newline at end of file